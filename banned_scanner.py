@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Banned Library Scanner
+======================
+
+Finds prohibited Bitcoin libraries in solution sources, for
+check_banned_simple.sh and secure_test_runner.py.
+
+The tree is walked once. Each file is assigned a language by its name
+and matched against one compiled regex per language: the alternation of
+every banned pattern of a rule set. check_banned_simple.sh uses the
+import-line patterns over the whole tree; secure_test_runner.py applies
+the stricter source patterns to the graded solution file. Python files
+are checked on their syntax tree: `import x`, `from x import y`,
+`__import__('x')` and `importlib.import_module('x')` are flagged by
+module name. The regex of the rule set runs as well, so imports hidden
+in strings such as `exec("import bitcoin")` are caught too. A Python
+file that does not parse is matched with the regex alone.
+
+Results are cached by file content hash, together with each path's
+size and modification time, so a re-scan only reads files that changed.
+By default the cache lives in memory for one process. Setting
+SCAN_CACHE_DIR keeps it on disk across runs; the directory must lie
+outside the working directory and the scanned trees (a cache file inside
+the graded checkout could vouch for any file), and a cache file not
+owned by the grader's user is ignored. The cache is discarded whenever
+the rules change. Set SCAN_CACHE=0 to disable it.
+
+Usage:
+    python3 banned_scanner.py solution
+    python3 banned_scanner.py solution/python/main.py
+Exit code: 0 (clean) or 1 (banned libraries found)
+"""
+
+import os
+import re
+import sys
+import ast
+import json
+import hashlib
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+import cache_paths
+
+CACHE_FILE = 'banned.json'
+# Cached results kept before the cache starts over
+MAX_CACHE_ENTRIES = 100000
+
+# Directories never scanned
+SKIP_DIRS = ('.git',)
+
+Finding = namedtuple('Finding', ['path', 'line', 'language', 'pattern', 'text'])
+
+# Import and include lines that pull in a banned library, by language
+# (the tree-wide check run by check_banned_simple.sh)
+IMPORT_PATTERNS = {
+    'python': [
+        r'(import|from).*(bip.?utils?|bit[^a-z]|bitcoin[^j]|bitcoinlib|mnemonic)',
+    ],
+    'javascript': [
+        r'(require|import).*(bitcoinjs-lib|bitcore-lib|bip32|bip39|ethers|web3)',
+    ],
+    'rust': [
+        r'(use|extern crate).*(bdk|bitcoin[^a-z]|btcaddr)',
+    ],
+    'go': [
+        r'import.*".*btc.*"',
+    ],
+    'cpp': [
+        r'#include.*libbitcoin',
+    ],
+}
+
+# Stricter patterns matched anywhere in the graded solution file
+# (secure_test_runner.py), case-insensitively
+SOURCE_PATTERNS = {
+    'python': [
+        r'import\s+bitcoind',
+        r'import\s+bitcoin\b',
+        r'from\s+bitcoin',
+        r'python-bitcoinlib',
+        r'pycoin',
+        r'hdwallet',
+    ],
+    'javascript': [
+        r'require\([\'"]bitcoinjs-lib[\'"]',
+        r'require\([\'"]bitcore-lib[\'"]',
+        r'import.*bitcoinjs-lib',
+        r'import.*bitcore-lib',
+        r'bip32',
+        r'bip39',
+        r'ethers',
+        r'web3',
+    ],
+    'rust': [
+        r'bdk\s*=',
+        r'bitcoin\s*=.*["\']',
+        r'btcaddr\s*=',
+    ],
+    'go': [
+        r'btcsuite/btcwallet',
+        r'btcsuite/btcutil(?!/base58)',
+        r'tyler-smith/go-bip39',
+    ],
+    'cpp': [
+        r'libbitcoin',
+        r'libbitcoin.client',
+        r'libbitcoin.wallet',
+    ],
+}
+
+RULESETS = {
+    'imports': (IMPORT_PATTERNS, 0),
+    'source': (SOURCE_PATTERNS, re.IGNORECASE),
+}
+
+# Python modules banned by name (top-level package, '-' read as '_');
+# anything starting with "bitcoin" is banned as well
+PYTHON_BANNED_MODULES = frozenset({
+    'bit', 'bitcoin', 'bip_utils', 'biputils', 'bip_util', 'mnemonic', 'pycoin', 'hdwallet',
+})
+
+# File suffixes and exact names that select a language
+LANGUAGE_SUFFIXES = {
+    '.py': 'python',
+    '.js': 'javascript', '.mjs': 'javascript', '.cjs': 'javascript', '.ts': 'javascript',
+    '.rs': 'rust',
+    '.go': 'go',
+    '.cpp': 'cpp', '.cc': 'cpp', '.h': 'cpp', '.hpp': 'cpp',
+}
+LANGUAGE_FILENAMES = {
+    'Cargo.toml': 'rust',
+    'go.mod': 'go',
+}
+
+
+def _combine(patterns, flags):
+    """Compile patterns into one regex; group `p<i>` tells which one matched."""
+    return re.compile('|'.join(f'(?P<p{i}>{pattern})' for i, pattern in enumerate(patterns)), flags)
+
+
+# One compiled regex per rule set and language
+COMBINED_PATTERNS = {
+    (ruleset, language): _combine(patterns, flags)
+    for ruleset, (table, flags) in RULESETS.items()
+    for language, patterns in table.items()
+}
+
+# Bump when the matching logic changes, so cached results are discarded
+RULES_VERSION = 3
+
+RULES_FINGERPRINT = hashlib.sha256(json.dumps(
+    [RULES_VERSION, IMPORT_PATTERNS, SOURCE_PATTERNS, sorted(PYTHON_BANNED_MODULES)],
+    sort_keys=True).encode()).hexdigest()
+
+
+def language_of(path):
+    """Return the language whose rules apply to `path`, or None."""
+    name = os.path.basename(path)
+    return LANGUAGE_FILENAMES.get(name) or LANGUAGE_SUFFIXES.get(os.path.splitext(name)[1])
+
+
+def scan_regex(text, language, ruleset='imports'):
+    """
+    Match a source against the combined regex of its language.
+
+    Returns:
+        List of (line number, pattern, line text) for every match
+    """
+    regex = COMBINED_PATTERNS.get((ruleset, language))
+    if regex is None:
+        return []
+    patterns = RULESETS[ruleset][0][language]
+    matches = []
+    for match in regex.finditer(text):
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        line_end = text.find('\n', match.start())
+        line = text[line_start:line_end if line_end != -1 else len(text)]
+        matches.append((text.count('\n', 0, match.start()) + 1,
+                        patterns[int(match.lastgroup[1:])], line.strip()))
+    return matches
+
+
+def _python_imports(tree):
+    """Yield (line number, module name) for every import in a syntax tree."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield node.lineno, alias.name
+        elif isinstance(node, ast.ImportFrom):
+            if node.module and not node.level:
+                yield node.lineno, node.module
+        elif isinstance(node, ast.Call) and node.args:
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else getattr(func, 'attr', None)
+            argument = node.args[0]
+            if (name in ('__import__', 'import_module')
+                    and isinstance(argument, ast.Constant) and isinstance(argument.value, str)):
+                yield node.lineno, argument.value
+
+
+def is_banned_module(name):
+    """Check a Python module name against PYTHON_BANNED_MODULES."""
+    top = name.split('.')[0].lower().replace('-', '_')
+    return top in PYTHON_BANNED_MODULES or top.startswith('bitcoin')
+
+
+def scan_python(text, ruleset='imports'):
+    """
+    Find banned imports in Python source by its syntax tree.
+
+    The regex matches of the rule set are added as well, on lines the
+    syntax tree did not already flag, so imports built from strings
+    (`exec("import bitcoin")`) are caught.
+
+    Returns:
+        List of (line number, pattern, line text) in line order; sources
+        that do not parse are matched with the regex instead
+    """
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return scan_regex(text, 'python', ruleset)
+    lines = text.splitlines()
+    matches = [(line, f"import {name}", lines[line - 1].strip() if line <= len(lines) else '')
+               for line, name in _python_imports(tree) if is_banned_module(name)]
+    flagged = {line for line, _, _ in matches}
+    matches += [match for match in scan_regex(text, 'python', ruleset)
+                if match[0] not in flagged]
+    matches.sort()
+    return matches
+
+
+def scan_text(text, language, ruleset='imports'):
+    """Return (line number, pattern, line text) matches of a source in `language`."""
+    if language == 'python':
+        return scan_python(text, ruleset)
+    return scan_regex(text, language, ruleset)
+
+
+class ScanCache:
+    """Scan results by content hash, plus the last seen stat of each path."""
+
+    def __init__(self, cache_dir=None, trees=()):
+        """
+        Args:
+            cache_dir: Directory to persist the cache in, or None to keep
+                it in memory only
+            trees: Scanned directories the cache directory must stay out of
+                (the working directory is always checked)
+
+        Raises:
+            ValueError: If the cache directory lies inside a checked tree
+        """
+        self.path = None
+        self.files = {}
+        self.results = {}
+        self.dirty = False
+        if not cache_dir:
+            return
+        self.path = cache_paths.outside_tree(cache_dir, Path.cwd(), *trees) / CACHE_FILE
+        if not cache_paths.is_trusted(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return
+        if entry.get('rules') == RULES_FINGERPRINT:
+            self.files = entry.get('files', {})
+            self.results = entry.get('results', {})
+
+    def save(self):
+        """Write the cache back if it changed (atomically; errors are ignored)."""
+        if not self.dirty or self.path is None:
+            return
+        if len(self.results) > MAX_CACHE_ENTRIES:
+            self.files, self.results = {}, {}
+        tmp_path = self.path.with_name(f"{CACHE_FILE}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            cache_paths.make_private_dir(self.path.parent)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with open(fd, 'w', encoding='utf-8') as f:
+                json.dump({'rules': RULES_FINGERPRINT, 'files': self.files,
+                           'results': self.results}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+        self.dirty = False
+
+
+def scan_file(path, language=None, cache=None, ruleset='imports'):
+    """
+    Scan one file.
+
+    Args:
+        path: File to scan
+        language: Rules to apply (default: chosen by file name)
+        cache: ScanCache to consult and update, or None
+        ruleset: 'imports' or 'source' (see RULESETS)
+
+    Returns:
+        List of Findings
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    path = str(path)
+    language = language or language_of(path)
+    if (ruleset, language) not in COMBINED_PATTERNS:
+        return []
+
+    stat = os.stat(path)
+    signature = [stat.st_size, stat.st_mtime_ns]
+    matches = None
+    if cache is not None:
+        seen = cache.files.get(path)
+        if seen and seen[:2] == signature:
+            matches = cache.results.get(f"{ruleset}:{language}:{seen[2]}")
+
+    if matches is None:
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"{ruleset}:{language}:{digest}"
+        matches = cache.results.get(key) if cache is not None else None
+        if matches is None:
+            matches = scan_text(data.decode('utf-8', 'replace'), language, ruleset)
+        if cache is not None:
+            cache.files[path] = signature + [digest]
+            cache.results[key] = matches
+            cache.dirty = True
+
+    return [Finding(path, line, language, pattern, text) for line, pattern, text in matches]
+
+
+def scan_tree(root, cache=None):
+    """
+    Scan every source file under `root` in one walk.
+
+    Returns:
+        Tuple of (list of Findings, list of (path, error) for unreadable files)
+    """
+    findings = []
+    errors = []
+    if os.path.isfile(root):
+        paths = [root]
+    else:
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            paths.extend(os.path.join(dirpath, name) for name in sorted(filenames)
+                         if language_of(name))
+    for path in paths:
+        try:
+            findings.extend(scan_file(path, cache=cache))
+        except OSError as e:
+            errors.append((path, str(e)))
+    return findings, errors
+
+
+_memory_cache = None
+
+
+def default_cache(trees=()):
+    """
+    Return the cache selected by the environment, or None if SCAN_CACHE=0.
+
+    Without SCAN_CACHE_DIR this is one in-memory cache shared by the
+    process. A SCAN_CACHE_DIR inside the working directory or `trees` is
+    ignored with a warning.
+    """
+    global _memory_cache
+    if os.environ.get('SCAN_CACHE', '1') == '0':
+        return None
+    cache_dir = os.environ.get('SCAN_CACHE_DIR')
+    if cache_dir:
+        try:
+            return ScanCache(cache_dir, trees)
+        except ValueError as e:
+            print(f"Warning: not using SCAN_CACHE_DIR: {e}", file=sys.stderr)
+    if _memory_cache is None:
+        _memory_cache = ScanCache()
+    return _memory_cache
+
+
+LANGUAGE_LABELS = {
+    'python': ('🐍', 'Python'),
+    'javascript': ('🟨', 'JavaScript'),
+    'rust': ('🦀', 'Rust'),
+    'go': ('🐹', 'Go'),
+    'cpp': ('⚡', 'C++'),
+}
+
+# Findings printed per language
+SHOWN_FINDINGS = 5
+
+
+def main():
+    """Scan the given paths and report per language."""
+    roots = sys.argv[1:] or ['solution']
+    cache = default_cache(roots)
+    findings = []
+    errors = []
+    for root in roots:
+        root_findings, root_errors = scan_tree(root, cache)
+        findings.extend(root_findings)
+        errors.extend(root_errors)
+    if cache is not None:
+        cache.save()
+
+    for language, (icon, label) in LANGUAGE_LABELS.items():
+        hits = [finding for finding in findings if finding.language == language]
+        if not hits:
+            print(f"{icon} {label} files clean")
+            continue
+        print(f"{icon} ❌ BANNED {label} libraries detected!")
+        for finding in hits[:SHOWN_FINDINGS]:
+            print(f"    {finding.path}:{finding.line}: {finding.text}  [{finding.pattern}]")
+    for path, error in errors:
+        print(f"Error reading {path}: {error}", file=sys.stderr)
+    sys.exit(1 if findings else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Base58Check Encoding
+====================
+
+Base58 and Base58Check encoding specialized for the short payloads used
+in key derivation (38-byte WIF and 25-byte P2PKH payloads).
+
+Instead of dividing the payload by 58 once per output character, the
+payload integer is split into 58^10 limbs (each fits in a machine word)
+and every limb is rendered through a precomputed table of two-character
+digit pairs. A 38-byte WIF payload needs 6 big-integer divisions instead
+of 52.
+
+Used by derive_cli.py and the result store. The validator does not use
+it: reference_engine.py encodes expected outputs with the base58 package.
+"""
+
+import hashing
+
+ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+# Version bytes for mainnet payloads
+WIF_VERSION = 0x80
+P2PKH_VERSION = 0x00
+
+_LIMB_DIGITS = 10
+_LIMB = 58 ** _LIMB_DIGITS
+_PAIR_BASE = 58 * 58
+
+# _PAIRS[i] is the two-digit Base58 rendering of i for 0 <= i < 58^2
+_PAIRS = [ALPHABET[i // 58] + ALPHABET[i % 58] for i in range(_PAIR_BASE)]
+
+_DIGIT_VALUES = {c: i for i, c in enumerate(ALPHABET)}
+
+
+def _render_limb(limb):
+    """Render a limb below 58^10 as exactly 10 Base58 digits."""
+    pairs = _PAIRS
+    limb, d4 = divmod(limb, _PAIR_BASE)
+    limb, d3 = divmod(limb, _PAIR_BASE)
+    limb, d2 = divmod(limb, _PAIR_BASE)
+    d0, d1 = divmod(limb, _PAIR_BASE)
+    return pairs[d0] + pairs[d1] + pairs[d2] + pairs[d3] + pairs[d4]
+
+
+def b58encode(data):
+    """
+    Encode bytes as Base58.
+
+    Args:
+        data: Bytes to encode
+
+    Returns:
+        Base58 string; each leading zero byte becomes a leading '1'
+    """
+    stripped = data.lstrip(b'\x00')
+    prefix = '1' * (len(data) - len(stripped))
+    n = int.from_bytes(stripped, 'big')
+    if not n:
+        return prefix
+
+    limbs = []
+    while n >= _LIMB:
+        n, limb = divmod(n, _LIMB)
+        limbs.append(_render_limb(limb))
+    limbs.append(_render_limb(n).lstrip('1'))
+    limbs.reverse()
+    return prefix + ''.join(limbs)
+
+
+def b58decode(text):
+    """
+    Decode a Base58 string.
+
+    Args:
+        text: Base58 string
+
+    Returns:
+        Decoded bytes; each leading '1' becomes a leading zero byte
+
+    Raises:
+        ValueError: If the string contains a non-Base58 character
+    """
+    values = _DIGIT_VALUES
+    n = 0
+    try:
+        for c in text:
+            n = n * 58 + values[c]
+    except KeyError as e:
+        raise ValueError(f"Invalid Base58 character {e.args[0]!r}")
+
+    zeros = len(text) - len(text.lstrip('1'))
+    return b'\x00' * zeros + n.to_bytes((n.bit_length() + 7) // 8, 'big')
+
+
+checksum = hashing.checksum
+
+
+def b58check_encode(payload):
+    """
+    Encode a versioned payload with its Base58Check checksum.
+
+    Args:
+        payload: Version byte(s) followed by the data
+
+    Returns:
+        Base58Check string
+    """
+    return b58encode(payload + checksum(payload))
+
+
+def b58check_encode_many(buffer, width):
+    """
+    Base58Check-encode every fixed-width payload in a buffer.
+
+    Checksums come from hashing.checksum_many for the whole buffer.
+
+    Args:
+        buffer: Bytes-like object holding versioned payloads back to back
+        width: Payload width in bytes (21 for P2PKH, 34 for compressed WIF)
+
+    Returns:
+        List of Base58Check strings in payload order
+    """
+    data = bytes(buffer)
+    checksums = hashing.checksum_many(data, width)
+    encode = b58encode
+    return [encode(data[offset:offset + width] + checksums[row * 4:row * 4 + 4])
+            for row, offset in enumerate(range(0, len(data), width))]
+
+
+def b58check_decode(text, version=None, length=None):
+    """
+    Decode and validate a Base58Check string.
+
+    Args:
+        text: Base58Check string
+        version: Expected version byte, or None to accept any
+        length: Expected payload length including the version byte, or
+            None to accept any
+
+    Returns:
+        The versioned payload without its checksum
+
+    Raises:
+        ValueError: If the string is not valid Base58, the checksum does
+            not match, or the version or length is unexpected
+    """
+    data = b58decode(text)
+    if len(data) < 5:
+        raise ValueError("Base58Check data too short")
+
+    payload, check = data[:-4], data[-4:]
+    if checksum(payload) != check:
+        raise ValueError("Base58Check checksum mismatch")
+    if length is not None and len(payload) != length:
+        raise ValueError(f"Expected {length}-byte payload, got {len(payload)}")
+    if version is not None and payload[0] != version:
+        raise ValueError(f"Expected version byte 0x{version:02x}, got 0x{payload[0]:02x}")
+    return payload
+
+
+def encode_wif(private_key_bytes):
+    """Encode a 32-byte private key as a compressed mainnet WIF."""
+    return b58check_encode(bytes([WIF_VERSION]) + private_key_bytes + b'\x01')
+
+
+def decode_wif(wif):
+    """
+    Decode a compressed mainnet WIF.
+
+    Returns:
+        32-byte private key
+
+    Raises:
+        ValueError: If the WIF is malformed
+    """
+    payload = b58check_decode(wif, version=WIF_VERSION, length=34)
+    if payload[-1] != 0x01:
+        raise ValueError("WIF is missing the compression flag")
+    return payload[1:33]
+
+
+def encode_address(hash160):
+    """Encode a 20-byte Hash160 as a mainnet P2PKH address."""
+    return b58check_encode(bytes([P2PKH_VERSION]) + hash160)
+
+
+def decode_address(address):
+    """
+    Decode a mainnet P2PKH address.
+
+    Returns:
+        20-byte Hash160
+
+    Raises:
+        ValueError: If the address is malformed
+    """
+    return b58check_decode(address, version=P2PKH_VERSION, length=21)[1:]
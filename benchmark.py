@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Key Derivation Benchmark Suite
+==============================
+
+Times the key derivation pipeline on a reproducible key set (derived
+from a fixed seed with secure_tests.py), fully offline:
+
+    stages      per-call cost of scalar multiplication (table and ladder
+                backends), point compression, Hash160, WIF encoding and
+                Base58 address encoding
+    single      derive_cli.py functions, one key at a time
+    batch       derive_cli.derive_chunk over chunks of keys, in-process
+    parallel    derive_cli.run_chunks across a process pool
+    reference   the SecureValidator reference path (reference_engine.py)
+
+Every benchmark reports keys/sec, p50/p90/p99 per-key latency in
+microseconds and the peak RSS of the process (and its children) so far.
+Batch modes sample latency per chunk, divided by the chunk size.
+
+Results can be written as JSON with --output. Pass a saved result file
+as --baseline to fail (exit code 1) when any benchmark's keys/sec drops
+more than --threshold (default 10%) below the baseline.
+
+Usage:
+    python3 benchmark.py
+    python3 benchmark.py --sizes 1000,10000,100000 --workers 4 --output bench.json
+    python3 benchmark.py --baseline bench.json --threshold 0.15
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+
+import ecmult
+import base58check
+import hashing
+import reference_engine
+import secure_tests
+import derive_cli
+
+BENCH_SEED = 'benchmark'
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_STAGE_KEYS = 2000
+DEFAULT_THRESHOLD = 0.10
+CHUNK_KEYS = 256
+
+
+def bench_keys(count):
+    """Return `count` reproducible 32-byte private keys."""
+    return [key for _, key in secure_tests.iter_test_keys(BENCH_SEED, count=count)]
+
+
+def percentiles(samples):
+    """
+    Summarize per-key latency samples.
+
+    Args:
+        samples: Per-key times in seconds
+
+    Returns:
+        Dict of p50/p90/p99 in microseconds (nearest-rank)
+    """
+    if not samples:
+        return {'p50': 0.0, 'p90': 0.0, 'p99': 0.0}
+    ordered = sorted(samples)
+    result = {}
+    for name, q in (('p50', 50), ('p90', 90), ('p99', 99)):
+        rank = max(1, -(-q * len(ordered) // 100))
+        result[name] = round(ordered[rank - 1] * 1e6, 3)
+    return result
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process and its children in MiB."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / 1024, 1)  # ru_maxrss is in KiB on Linux
+
+
+def summarize(name, keys, elapsed, samples):
+    """Build the result entry of one benchmark."""
+    return {
+        'name': name,
+        'keys': keys,
+        'seconds': round(elapsed, 6),
+        'keys_per_sec': round(keys / elapsed, 1) if elapsed > 0 else 0.0,
+        'latency_us': percentiles(samples),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def time_each(func, inputs):
+    """
+    Call `func` on every input, timing each call.
+
+    Returns:
+        Tuple of (total seconds, list of per-call seconds, list of results)
+    """
+    clock = time.perf_counter
+    samples = []
+    results = []
+    start = clock()
+    for item in inputs:
+        t0 = clock()
+        results.append(func(item))
+        samples.append(clock() - t0)
+    return clock() - start, samples, results
+
+
+def bench_stages(private_keys):
+    """Time each derivation stage separately over the same keys."""
+    results = []
+
+    start = time.perf_counter()
+    table = ecmult.FixedBaseTable()
+    table.build()
+    results.append(summarize('stage/table_build', 1, time.perf_counter() - start,
+                             [time.perf_counter() - start]))
+
+    scalars = [int.from_bytes(key, 'big') for key in private_keys]
+    elapsed, samples, points = time_each(table.multiply, scalars)
+    results.append(summarize('stage/scalar_mult', len(scalars), elapsed, samples))
+
+    elapsed, samples, _ = time_each(ecmult.ladder_multiply, scalars)
+    results.append(summarize('stage/scalar_mult_ladder', len(scalars), elapsed, samples))
+
+    def compress(point):
+        return ecmult.encode_compressed(*ecmult.to_affine(point))
+
+    elapsed, samples, pubkeys = time_each(compress, points)
+    results.append(summarize('stage/compression', len(points), elapsed, samples))
+
+    elapsed, samples, hash160s = time_each(hashing.hash160, pubkeys)
+    results.append(summarize('stage/hash160', len(pubkeys), elapsed, samples))
+
+    elapsed, samples, _ = time_each(base58check.encode_wif, private_keys)
+    results.append(summarize('stage/wif', len(private_keys), elapsed, samples))
+
+    payloads = [b'\x00' + h + hashing.checksum(b'\x00' + h) for h in hash160s]
+    elapsed, samples, _ = time_each(base58check.b58encode, payloads)
+    results.append(summarize('stage/base58', len(payloads), elapsed, samples))
+    return results
+
+
+def bench_single(private_keys):
+    """Time single-key derivation through derive_cli's public functions."""
+    def derive(key):
+        pubkey = derive_cli.generate_compressed_pubkey(key)
+        return pubkey, derive_cli.generate_wif(key), derive_cli.generate_address(pubkey)
+
+    elapsed, samples, _ = time_each(derive, private_keys)
+    return summarize(f'single/{len(private_keys)}', len(private_keys), elapsed, samples)
+
+
+def _line_chunks(private_keys):
+    """Split keys into (first line number, hex lines) chunks for derive_chunk."""
+    lines = [key.hex().upper() for key in private_keys]
+    return [(first + 1, lines[first:first + CHUNK_KEYS])
+            for first in range(0, len(lines), CHUNK_KEYS)]
+
+
+def bench_batch(private_keys):
+    """Time in-process chunked derivation."""
+    chunks = _line_chunks(private_keys)
+    elapsed, chunk_times, _ = time_each(lambda args: derive_cli.derive_chunk(*args), chunks)
+    samples = [t / len(lines) for t, (_, lines) in zip(chunk_times, chunks)]
+    return summarize(f'batch/{len(private_keys)}', len(private_keys), elapsed, samples)
+
+
+def bench_parallel(private_keys, workers):
+    """
+    Time chunked derivation across a process pool.
+
+    Latency samples are the gaps between ordered chunk completions seen
+    by the parent, divided by the chunk size.
+    """
+    chunks = _line_chunks(private_keys)
+    clock = time.perf_counter
+    samples = []
+    start = last = clock()
+    for (_, lines), _ in zip(chunks, derive_cli.run_chunks(derive_cli.derive_chunk, chunks, workers)):
+        now = clock()
+        samples.append((now - last) / len(lines))
+        last = now
+    elapsed = clock() - start
+    return summarize(f'parallel{workers}/{len(private_keys)}', len(private_keys), elapsed, samples)
+
+
+def bench_reference(private_keys):
+    """Time the validator's reference output computation, in-process."""
+    keys_hex = [key.hex().upper() for key in private_keys]
+    chunks = [keys_hex[first:first + CHUNK_KEYS] for first in range(0, len(keys_hex), CHUNK_KEYS)]
+    elapsed, chunk_times, _ = time_each(reference_engine.derive_reference_chunk, chunks)
+    samples = [t / len(chunk) for t, chunk in zip(chunk_times, chunks)]
+    return summarize(f'reference/{len(private_keys)}', len(private_keys), elapsed, samples)
+
+
+def run_suite(sizes, workers, stage_keys, modes):
+    """
+    Run the selected benchmarks.
+
+    Args:
+        sizes: Key counts for the end-to-end benchmarks
+        workers: Worker processes for parallel mode
+        stage_keys: Key count for the per-stage benchmarks
+        modes: Names of the benchmark groups to run
+
+    Returns:
+        Report dict with environment metadata and a list of results
+    """
+    ecmult.get_table()  # warm up so end-to-end runs exclude the table build
+    results = []
+    if 'stages' in modes:
+        results.extend(bench_stages(bench_keys(stage_keys)))
+    for size in sizes:
+        private_keys = bench_keys(size)
+        if 'single' in modes:
+            results.append(bench_single(private_keys))
+        if 'batch' in modes:
+            results.append(bench_batch(private_keys))
+        if 'parallel' in modes:
+            results.append(bench_parallel(private_keys, workers))
+        if 'reference' in modes:
+            results.append(bench_reference(private_keys))
+
+    return {
+        'seed': BENCH_SEED,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'ripemd160_backend': hashing.RIPEMD160_BACKEND,
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """
+    Compare throughput against a baseline report.
+
+    Benchmarks missing from either report are ignored.
+
+    Returns:
+        List of (name, baseline keys/sec, current keys/sec) regressions
+    """
+    previous = {entry['name']: entry['keys_per_sec'] for entry in baseline.get('results', [])}
+    regressions = []
+    for entry in report['results']:
+        before = previous.get(entry['name'])
+        if before and entry['keys_per_sec'] < before * (1 - threshold):
+            regressions.append((entry['name'], before, entry['keys_per_sec']))
+    return regressions
+
+
+def print_report(report):
+    """Print results as a table."""
+    print(f"{'benchmark':<24} {'keys':>8} {'keys/s':>12} {'p50 µs':>10} "
+          f"{'p90 µs':>10} {'p99 µs':>10} {'peak MiB':>9}")
+    for entry in report['results']:
+        latency = entry['latency_us']
+        print(f"{entry['name']:<24} {entry['keys']:>8} {entry['keys_per_sec']:>12.1f} "
+              f"{latency['p50']:>10.2f} {latency['p90']:>10.2f} {latency['p99']:>10.2f} "
+              f"{entry['peak_rss_mb']:>9.1f}")
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Benchmark Bitcoin key derivation")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated key counts for end-to-end benchmarks")
+    parser.add_argument('--stage-keys', type=int, default=DEFAULT_STAGE_KEYS,
+                        help="key count for per-stage benchmarks")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="worker processes for parallel mode (0: one per CPU)")
+    parser.add_argument('--modes', default='stages,single,batch,parallel,reference',
+                        help="comma-separated benchmark groups to run")
+    parser.add_argument('--output', metavar='PATH', help="write results as JSON to PATH")
+    parser.add_argument('--baseline', metavar='PATH',
+                        help="fail if throughput regresses versus this JSON result file")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed keys/sec drop versus the baseline (fraction)")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Run the benchmark suite."""
+    args = parse_args()
+    try:
+        sizes = [int(size) for size in args.sizes.split(',') if size]
+    except ValueError:
+        print(f"❌ Invalid --sizes: {args.sizes}")
+        sys.exit(2)
+    modes = set(args.modes.split(','))
+    workers = args.workers or os.cpu_count() or 1
+
+    print(f"⏱️  Benchmarking key derivation (sizes: {sizes}, workers: {workers})")
+    report = run_suite(sizes, workers, args.stage_keys, modes)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot read baseline {args.baseline}: {e}")
+            sys.exit(2)
+
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Throughput regressed more than {args.threshold:.0%} versus baseline:")
+            for name, before, after in regressions:
+                print(f"   {name}: {before:.1f} -> {after:.1f} keys/s")
+            sys.exit(1)
+        print(f"\n✅ No throughput regression beyond {args.threshold:.0%} versus baseline")
+
+
+if __name__ == "__main__":
+    main()
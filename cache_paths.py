@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Grader Cache Locations
+======================
+
+Where the on-disk caches (compiled solutions, curve tables, reference
+outputs, scan results) may live.
+
+The runner executes inside the student checkout, so anything under the
+working directory is controlled by the code being graded: a committed
+file there can pose as a cached artifact. Caches therefore default to a
+per-user directory ($XDG_CACHE_HOME, else ~/.cache) and an explicitly
+configured directory is refused when it lies inside the graded tree.
+"""
+
+import os
+from pathlib import Path
+
+APP_DIR = 'bitcoin-assignment'
+
+
+def user_cache_dir(name):
+    """Return the per-user cache directory for `name` (not created)."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base).resolve() / APP_DIR / name
+
+
+def is_inside(path, root):
+    """Check whether `path` is `root` or lies below it (after resolving links)."""
+    path, root = Path(path).resolve(), Path(root).resolve()
+    return path == root or root in path.parents
+
+
+def outside_tree(path, *trees):
+    """
+    Resolve a cache directory and make sure no graded tree contains it.
+
+    Args:
+        path: Cache directory
+        *trees: Directories holding graded code (default: the working directory)
+
+    Returns:
+        The resolved path
+
+    Raises:
+        ValueError: If the directory lies inside one of the trees
+    """
+    path = Path(path).resolve()
+    for tree in trees or (Path.cwd(),):
+        if is_inside(path, tree):
+            raise ValueError(f"Cache directory {path} is inside the graded tree {Path(tree).resolve()}")
+    return path
+
+
+def make_private_dir(path):
+    """Create `path` (and parents) readable by the current user only."""
+    path = Path(path)
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    try:
+        path.chmod(0o700)
+    except OSError:
+        pass
+    return path
+
+
+def is_trusted(path):
+    """Check that `path` belongs to the current user and nobody else can write it."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    getuid = getattr(os, 'getuid', None)
+    if getuid is not None and st.st_uid != getuid():
+        return False
+    return not st.st_mode & 0o022
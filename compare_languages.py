@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Cross-Language Throughput Comparison
+====================================
+
+Runs every available solution under solution/ over the same key corpus
+(derived from ASSIGNMENT_SEED with secure_tests.py) and compares them:
+
+    keys/s      keys answered per second once the solution is running
+    startup     median wall time of a one-shot run, minus the p50 per-key
+                latency: the cost of starting the process
+    p50/p99     per-key latency in microseconds
+    peak RSS    high-water resident memory of the solution process
+    wrong       outputs that differ from the reference (reference_engine.py)
+
+Solutions are launched exactly as secure_test_runner.py launches them:
+compiled languages go through its build cache before any timing starts,
+so build time is excluded. Solutions that implement the persistent
+protocol are timed over one long-lived process; the others are started
+once per key, capped at --one-shot-limit keys.
+
+By default every implemented (non-template) solution is compared; pass
+--languages to choose explicitly.
+
+Usage:
+    python3 compare_languages.py --count 5000
+    python3 compare_languages.py --languages python,go --output compare.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import threading
+from pathlib import Path
+
+import reference_engine
+from benchmark import percentiles
+from secure_test_runner import (SecureValidator, PersistentWorker, WorkerError, WorkerExited,
+                                SOLUTION_FILES, TEST_TIMEOUT, find_solutions)
+
+DEFAULT_COUNT = 2000
+DEFAULT_ONE_SHOT_LIMIT = 100
+DEFAULT_STARTUP_RUNS = 5
+
+
+def process_peak_rss_kib(pid):
+    """Return the VmHWM (peak RSS) of a running process in KiB, or 0 if unknown."""
+    try:
+        with open(f"/proc/{pid}/status", 'r', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def run_measured(command, cwd, input_text, timeout=TEST_TIMEOUT):
+    """
+    Run a command once, measuring wall time and peak memory.
+
+    Returns:
+        Tuple of (stdout or None on failure, wall seconds, peak RSS in KiB)
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=cwd, text=True,
+                               stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL)
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        try:
+            process.stdin.write(input_text)
+            process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        stdout = process.stdout.read()
+        process.stdout.close()
+        # wait4 reaps the child and reports its resource usage
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    finally:
+        timer.cancel()
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        return None, elapsed, usage.ru_maxrss
+    return stdout, elapsed, usage.ru_maxrss
+
+
+def parse_answer(output):
+    """Extract (pubkey, wif, address) from solution output, or None if malformed."""
+    if output is None:
+        return None
+    lines = output.strip().split('\n')
+    if len(lines) != 3:
+        return None
+    prefixes = ('Compressed PubKey: ', 'WIF: ', 'Address: ')
+    if not all(line.startswith(prefix) for line, prefix in zip(lines, prefixes)):
+        return None
+    return tuple(line[len(prefix):].strip() for line, prefix in zip(lines, prefixes))
+
+
+def compare_language(validator, language, solution_file, test_keys, expected,
+                     one_shot_limit=DEFAULT_ONE_SHOT_LIMIT, startup_runs=DEFAULT_STARTUP_RUNS):
+    """
+    Measure one solution over the corpus.
+
+    Returns:
+        Result dict for the comparison table, or None if the solution
+        could not be prepared
+    """
+    prepared = validator.prepare_solution(solution_file, language)
+    if prepared is None:
+        return None
+    command, cwd, persistent_args = prepared
+    persistent = validator.supports_persistent(solution_file)
+    worker = None
+    if persistent:
+        try:
+            worker = PersistentWorker(command + persistent_args, cwd)
+        except WorkerExited:
+            # No READY handshake: measure one process per key instead
+            persistent = False
+
+    samples = []
+    answered = 0
+    wrong = 0
+    peak_kib = 0
+
+    def check(private_key, output):
+        nonlocal answered, wrong
+        answered += 1
+        want = expected[private_key]
+        if parse_answer(output) != (want['pubkey'], want['wif'], want['address']):
+            wrong += 1
+
+    if persistent:
+        try:
+            # The first key pays for process start-up and is not timed
+            start = None
+            for private_key in test_keys:
+                t0 = time.perf_counter()
+                try:
+                    output = worker.derive(private_key, TEST_TIMEOUT)
+                except (subprocess.TimeoutExpired, WorkerError, WorkerExited):
+                    if not worker.alive:
+                        break
+                    continue
+                if start is None:
+                    start = time.perf_counter()
+                else:
+                    samples.append(time.perf_counter() - t0)
+                check(private_key, output)
+            peak_kib = process_peak_rss_kib(worker.process.pid)
+        finally:
+            worker.close()
+        if not answered:
+            # The persistent process never answered: fall back to one-shot
+            persistent = False
+            samples.clear()
+            start = None
+
+    if not persistent:
+        test_keys = test_keys[:one_shot_limit]
+        start = time.perf_counter()
+        for private_key in test_keys:
+            output, elapsed, rss = run_measured(command, cwd, private_key)
+            peak_kib = max(peak_kib, rss)
+            if output is None:
+                continue
+            samples.append(elapsed)
+            check(private_key, output)
+    elapsed = time.perf_counter() - start if start is not None else 0.0
+
+    # Startup: a one-shot run is process start plus one key
+    one_shot_times = []
+    for _ in range(startup_runs):
+        output, one_shot, rss = run_measured(command, cwd, test_keys[0])
+        peak_kib = max(peak_kib, rss)
+        if output is not None:
+            one_shot_times.append(one_shot)
+    latency = percentiles(samples)
+    startup_ms = None
+    if one_shot_times:
+        startup_ms = max(0.0, statistics.median(one_shot_times) * 1e3 - latency['p50'] / 1e3)
+
+    return {
+        'language': language,
+        'mode': 'persistent' if persistent else 'one-shot',
+        'keys': len(test_keys),
+        'answered': answered,
+        'failed': len(test_keys) - answered,
+        'wrong': wrong,
+        'keys_per_sec': round(len(samples) / elapsed, 1) if elapsed > 0 else 0.0,
+        'startup_ms': round(startup_ms, 2) if startup_ms is not None else None,
+        'latency_us': latency,
+        'peak_rss_mb': round(peak_kib / 1024, 1),
+    }
+
+
+def print_table(results):
+    """Print the comparison table, fastest first."""
+    print(f"\n{'language':<12} {'mode':<11} {'keys':>6} {'keys/s':>10} {'startup ms':>11} "
+          f"{'p50 µs':>10} {'p99 µs':>10} {'peak MiB':>9} {'wrong':>6} {'failed':>7}")
+    for r in sorted(results, key=lambda r: -r['keys_per_sec']):
+        startup = f"{r['startup_ms']:.1f}" if r['startup_ms'] is not None else '-'
+        print(f"{r['language']:<12} {r['mode']:<11} {r['keys']:>6} {r['keys_per_sec']:>10.1f} "
+              f"{startup:>11} {r['latency_us']['p50']:>10.1f} {r['latency_us']['p99']:>10.1f} "
+              f"{r['peak_rss_mb']:>9.1f} {r['wrong']:>6} {r['failed']:>7}")
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Compare solution throughput across languages")
+    parser.add_argument('--languages',
+                        help="comma-separated languages (default: every implemented solution)")
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT,
+                        help="keys in the shared corpus")
+    parser.add_argument('--one-shot-limit', type=int, default=DEFAULT_ONE_SHOT_LIMIT,
+                        help="maximum keys for solutions without the persistent protocol")
+    parser.add_argument('--startup-runs', type=int, default=DEFAULT_STARTUP_RUNS,
+                        help="one-shot runs used to estimate startup overhead")
+    parser.add_argument('--output', metavar='PATH', help="write results as JSON to PATH")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Compare the available solutions."""
+    args = parse_args()
+    print("🏁 Cross-Language Throughput Comparison")
+    print("=" * 60)
+
+    if args.languages:
+        selected = []
+        for language in args.languages.split(','):
+            if language not in SOLUTION_FILES:
+                print(f"❌ Unsupported language: {language}")
+                sys.exit(2)
+            file_path = Path("solution") / language / SOLUTION_FILES[language]
+            if not file_path.exists():
+                print(f"❌ {language} solution file not found: {file_path}")
+                sys.exit(2)
+            selected.append((language, str(file_path)))
+    else:
+        selected, template_only = find_solutions()
+        for language, file_path in template_only:
+            print(f"⏭️  Skipping template: {language} ({file_path})")
+    if not selected:
+        print("❌ No implemented solutions found")
+        sys.exit(1)
+
+    validator = SecureValidator()
+    test_keys = validator.generate_test_keys(max(1, args.count))
+    expected = reference_engine.expected_outputs(validator.seed, test_keys)
+    print(f"✓ Corpus: {len(test_keys)} keys")
+
+    results = []
+    for language, solution_file in selected:
+        print(f"\n🧪 {language}: {solution_file}")
+        result = compare_language(validator, language, solution_file, test_keys, expected,
+                                  args.one_shot_limit, max(1, args.startup_runs))
+        if result is None:
+            print(f"❌ {language}: could not be prepared")
+            continue
+        results.append(result)
+
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'keys': len(test_keys), 'results': results}, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if any(r['wrong'] or r['failed'] for r in results):
+        print("\n❌ Some solutions produced wrong outputs or failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,859 @@
+#!/usr/bin/env python3
+"""
+Bitcoin Key Derivation CLI
+==========================
+
+Bulk key derivation tooling for instructors and load testing. This is
+not part of the assignment: the graded solutions live under solution/
+(solution/python/main.py is the student template) and are never
+replaced by this tool.
+
+Single-key mode reads a hexadecimal private key from stdin and prints
+the same three lines the assignment expects:
+Compressed PubKey: <compressed_public_key_hex>
+WIF: <wallet_import_format>
+Address: <p2pkh_address>
+
+Public keys are derived with the fixed-base window engine in ecmult.py
+(its tables are cached per user, outside the repository; use --backend
+ladder for the uniform Montgomery ladder), and Base58Check strings with
+the table-driven encoder in base58check.py. Hash160 and checksums come
+from hashing.py, which falls back to a pure-Python RIPEMD-160 when
+OpenSSL does not provide it.
+
+Streaming mode (--stream):
+Reads newline-delimited hex keys from stdin and writes one tab-separated
+record per key: <compressed_public_key_hex>\t<wif>\t<address>
+Bad lines are reported on stderr and the run continues. Add --workers N
+to derive chunks across N processes (0: one per CPU) with ordered output.
+
+Range mode (--range START COUNT [--stride STEP]):
+Derives COUNT consecutive keys START, START+STEP, ... (START in hex) by
+point addition and writes the same records as streaming mode.
+
+Persistent mode (--persistent):
+The test runner protocol (see secure_test_runner.py): a READY line once
+started, then each stdin line is answered with the three output lines
+above plus an empty line.
+
+Key-file mode (--key-file PATH):
+Derives every key of a binary file of raw 32-byte keys, read through
+mmap. Bulk modes take --format text|csv|jsonl|binary (see record_io.py;
+binary is the default for key files) and --output PATH.
+
+Watch-list matching (--watch PATH):
+Bulk modes compare each derived Hash160 with a set of target addresses
+(see watchlist.py) and write only the matching keys, skipping checksum
+and Base58 work for the rest.
+
+Daemon mode (--serve unix:PATH | tcp:HOST:PORT, HOST loopback only):
+Keeps the curve table and hashers warm and answers derivation requests
+over a socket, coalescing concurrent requests into batches. See
+derive_daemon.py for the protocol and derive_client.py for a client.
+
+Start-up: a plain single-key run imports only ecmult, base58check and
+hashing, skips argument parsing, and loads a small cached curve table
+(see ecmult.py). --self-timing reports where the time went on stderr.
+
+Instrumentation (--metrics json|prometheus, --profile REPORT):
+Opt-in per-stage counters and timing histograms, dumped on stderr (or to
+--metrics-file) at exit and on SIGUSR1; --profile runs a bulk mode under
+cProfile and tracemalloc. See instrument.py for the environment variables.
+"""
+
+import time
+
+_STARTED = time.perf_counter()
+
+import os
+import sys
+
+# Only what the single-key path needs is imported up front. Bulk-mode and
+# tooling modules (argparse, concurrent.futures, instrument, ...) are
+# imported inside the functions that use them.
+import ecmult
+import base58check
+import hashing
+
+_IMPORTED = time.perf_counter()
+
+SECP256K1_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+# Number of keys derived and written per batch in streaming mode
+STREAM_FLUSH_RECORDS = 1024
+
+
+def parse_private_key(private_key_hex):
+    """
+    Parse a hexadecimal private key.
+
+    Args:
+        private_key_hex: 64-character hexadecimal string
+
+    Returns:
+        32-byte private key
+
+    Raises:
+        ValueError: If the input is not valid hex, not 32 bytes long or
+            outside the secp256k1 range [1, n-1]
+    """
+    try:
+        private_key_bytes = bytes.fromhex(private_key_hex)
+    except ValueError:
+        raise ValueError("Invalid hexadecimal input")
+
+    if len(private_key_bytes) != 32:
+        raise ValueError("Private key must be 32 bytes (64 hex chars)")
+
+    key_int = int.from_bytes(private_key_bytes, 'big')
+    if key_int == 0 or key_int >= SECP256K1_ORDER:
+        raise ValueError("Private key out of secp256k1 range")
+
+    return private_key_bytes
+
+
+def generate_compressed_pubkey(private_key_bytes):
+    """
+    Generate compressed public key from private key.
+
+    Steps:
+    1. Multiply G by the private key with the fixed-base window table
+    2. Compress: 0x02 + x if y is even, 0x03 + x if y is odd
+
+    Args:
+        private_key_bytes: 32-byte private key
+
+    Returns:
+        33-byte compressed public key
+    """
+    return ecmult.compressed_pubkey(private_key_bytes)
+
+
+def generate_compressed_pubkeys(private_keys):
+    """
+    Generate compressed public keys for many private keys at once.
+
+    All points share a single field inversion (Montgomery's trick), which
+    is much cheaper than one inversion per key on large batches.
+
+    Args:
+        private_keys: Sequence of 32-byte private keys
+
+    Returns:
+        List of 33-byte compressed public keys in input order
+    """
+    return ecmult.compressed_pubkeys(private_keys)
+
+
+def generate_wif(private_key_bytes):
+    """
+    Generate Wallet Import Format from private key.
+
+    Steps:
+    1. Add version byte 0x80 (mainnet)
+    2. Add private key (32 bytes)
+    3. Add compression flag 0x01
+    4. Calculate checksum: first 4 bytes of SHA256(SHA256(data))
+    5. Base58 encode the result
+
+    Args:
+        private_key_bytes: 32-byte private key
+
+    Returns:
+        Base58-encoded WIF string
+    """
+    extended_key = b'\x80' + private_key_bytes + b'\x01'
+    return base58check.b58check_encode(extended_key)
+
+
+def generate_address(compressed_pubkey):
+    """
+    Generate P2PKH address from compressed public key.
+
+    Steps:
+    1. SHA-256 hash of public key
+    2. RIPEMD-160 hash of SHA-256 result (Hash160)
+    3. Add version byte 0x00 (P2PKH mainnet)
+    4. Calculate checksum: first 4 bytes of SHA256(SHA256(data))
+    5. Base58 encode the result
+
+    Args:
+        compressed_pubkey: 33-byte compressed public key
+
+    Returns:
+        Base58-encoded P2PKH address
+    """
+    versioned_payload = b'\x00' + hashing.hash160(compressed_pubkey)
+    return base58check.b58check_encode(versioned_payload)
+
+
+def derive_results(private_keys, store=None):
+    """
+    Derive a batch of keys into a compact result store.
+
+    Public keys, Hash160s and address checksums are kept in contiguous
+    fixed-width columns; WIF and address strings are rendered only when a
+    row is read.
+
+    Args:
+        private_keys: Sequence of 32-byte private keys
+        store: Existing ResultStore to append to, or None for a new one
+
+    Returns:
+        The ResultStore holding the batch
+    """
+    import result_store
+
+    if store is None:
+        store = result_store.ResultStore(len(private_keys))
+    store.append_batch(private_keys, generate_compressed_pubkeys(private_keys))
+    return store
+
+
+def derive_records(private_keys):
+    """
+    Derive text-format output records for a batch of private keys.
+
+    Args:
+        private_keys: Sequence of 32-byte private keys
+
+    Returns:
+        List of newline-terminated tab-separated records in input order
+    """
+    return derive_results(private_keys).records()
+
+
+def read_chunks(infile, chunk_lines):
+    """
+    Split a line stream into chunks without reading it all.
+
+    Args:
+        infile: Text stream of lines
+        chunk_lines: Maximum number of lines per chunk
+
+    Yields:
+        Tuples of (line number of the first line, list of lines)
+    """
+    import itertools
+
+    line_number = 1
+    while True:
+        lines = list(itertools.islice(infile, chunk_lines))
+        if not lines:
+            return
+        yield line_number, lines
+        line_number += len(lines)
+
+
+def derive_chunk(first_line_number, lines, fmt='text', watch=None):
+    """
+    Derive records for a chunk of input lines.
+
+    Blank lines are skipped and malformed lines produce an error message
+    carrying their line number.
+
+    Args:
+        first_line_number: Line number of lines[0] in the input
+        lines: Hex private keys, one per line
+        fmt: Output format (see record_io.FORMATS)
+        watch: Watch-list path; if given, only matching keys are rendered
+
+    Returns:
+        Tuple of (rendered output bytes, list of error messages, keys derived)
+    """
+    import record_io
+
+    batch = []
+    indices = []
+    errors = []
+    for line_number, line in enumerate(lines, first_line_number):
+        private_key_hex = line.strip()
+        if not private_key_hex:
+            continue
+        try:
+            batch.append(parse_private_key(private_key_hex))
+            indices.append(line_number - 1)
+        except ValueError as e:
+            errors.append(f"Error: line {line_number}: {e}")
+
+    if watch is not None:
+        output = render_matches(batch, generate_compressed_pubkeys(batch), indices, fmt, watch)
+    else:
+        output = record_io.render(derive_results(batch), indices, fmt)
+    return output, errors, len(batch)
+
+
+def derive_key_chunk(first_index, key_buffer, fmt='text', watch=None):
+    """
+    Derive records for a chunk of a binary key file.
+
+    Keys are read straight from `key_buffer` through memoryview slices.
+    Keys outside [1, n-1] produce an error message carrying their index.
+
+    Args:
+        first_index: Index of the first key in the file
+        key_buffer: Bytes-like object holding raw 32-byte keys
+        fmt: Output format (see record_io.FORMATS)
+        watch: Watch-list path; if given, only matching keys are rendered
+
+    Returns:
+        Tuple of (rendered output bytes, list of error messages, keys derived)
+    """
+    import record_io
+
+    batch = []
+    indices = []
+    errors = []
+    for index, key in enumerate(record_io.split_keys(key_buffer), first_index):
+        key_int = int.from_bytes(key, 'big')
+        if key_int == 0 or key_int >= SECP256K1_ORDER:
+            errors.append(f"Error: key {index}: Private key out of secp256k1 range")
+            continue
+        batch.append(key)
+        indices.append(index)
+
+    if watch is not None:
+        output = render_matches(batch, generate_compressed_pubkeys(batch), indices, fmt, watch)
+    else:
+        output = record_io.render(derive_results(batch), indices, fmt)
+    return output, errors, len(indices)
+
+
+def render_matches(private_keys, compressed_pubkeys, indices, fmt, watch):
+    """
+    Render only the keys whose Hash160 is on a watch list.
+
+    Hash160s are computed for the whole batch and looked up first; the
+    address checksum and Base58 strings are produced for matches only.
+
+    Args:
+        private_keys: Sequence of 32-byte private keys
+        compressed_pubkeys: Their 33-byte compressed public keys
+        indices: Input index of each key
+        fmt: Output format (see record_io.FORMATS)
+        watch: Path of a watch-list index or address file (see watchlist.py)
+
+    Returns:
+        Rendered records of the matching keys as bytes
+    """
+    import record_io
+    import result_store
+    import watchlist
+
+    rows = watchlist.load(watch).match(hashing.hash160_many(b''.join(compressed_pubkeys)))
+    store = result_store.ResultStore(len(rows))
+    store.append_batch([private_keys[row] for row in rows],
+                       [compressed_pubkeys[row] for row in rows])
+    return record_io.render(store, [indices[row] for row in rows], fmt)
+
+
+def _init_worker():
+    """Process pool initializer: build the curve table once per worker."""
+    ecmult.get_table()
+
+
+def _run_in_worker(func, args):
+    """Run func(*args) in a pool worker and report its pid and busy time."""
+    started = time.perf_counter()
+    output, errors, count = func(*args)
+    return output, errors, count, os.getpid(), time.perf_counter() - started
+
+
+def run_chunks(func, chunks, workers=1, max_in_flight=None, stats=None):
+    """
+    Apply a chunk derivation function to every chunk, in input order.
+
+    With one worker the chunks are derived in this process. Otherwise they
+    are derived concurrently in a process pool; results are still yielded
+    in input order, and at most `max_in_flight` chunks are queued or
+    running at once, so memory stays flat on inputs of any size.
+
+    Args:
+        func: Module-level function returning (output, errors, count)
+        chunks: Iterable of argument tuples for `func`
+        workers: Number of worker processes (None or 0: CPU count)
+        max_in_flight: Maximum outstanding chunks (default: 2 * workers)
+        stats: Optional dict filled with per-worker
+            {pid: {'keys': int, 'chunks': int, 'busy': seconds}} totals
+
+    Yields:
+        Tuples of (output, errors, count) in chunk order
+    """
+    import collections
+    import concurrent.futures
+
+    def record(count, pid, busy):
+        if stats is not None:
+            worker = stats.setdefault(pid, {'keys': 0, 'chunks': 0, 'busy': 0.0})
+            worker['keys'] += count
+            worker['chunks'] += 1
+            worker['busy'] += busy
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for args in chunks:
+            output, errors, count, pid, busy = _run_in_worker(func, args)
+            record(count, pid, busy)
+            yield output, errors, count
+        return
+
+    max_in_flight = max_in_flight or 2 * workers
+    pending = collections.deque()
+
+    # Build the table before forking so workers inherit it
+    ecmult.get_table()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                initializer=_init_worker) as pool:
+        for args in chunks:
+            if len(pending) >= max_in_flight:
+                output, errors, count, pid, busy = pending.popleft().result()
+                record(count, pid, busy)
+                yield output, errors, count
+            pending.append(pool.submit(_run_in_worker, func, args))
+        while pending:
+            output, errors, count, pid, busy = pending.popleft().result()
+            record(count, pid, busy)
+            yield output, errors, count
+
+
+def write_chunks(results, outfile, errfile):
+    """
+    Write chunk results produced by run_chunks.
+
+    Args:
+        results: Iterable of (output bytes, errors, count)
+        outfile: Binary stream receiving the records
+        errfile: Text stream receiving the error messages
+
+    Returns:
+        Tuple of (keys derived, inputs rejected)
+    """
+    derived = 0
+    rejected = 0
+    for output, errors, count in results:
+        for message in errors:
+            print(message, file=errfile)
+        outfile.write(output)
+        outfile.flush()
+        derived += count
+        rejected += len(errors)
+    return derived, rejected
+
+
+def stream_keys(infile, outfile, errfile, flush_records=STREAM_FLUSH_RECORDS,
+                fmt='text', workers=1, max_in_flight=None, stats=None, watch=None):
+    """
+    Derive keys from a newline-delimited stream of hex private keys.
+
+    Lines are processed in chunks of `flush_records`, so memory stays
+    bounded regardless of input size. Each chunk is derived with a single
+    shared inversion and written in one call. Blank lines are skipped;
+    malformed lines are reported on `errfile` with their line number and
+    skipped.
+
+    Args:
+        infile: Text stream of hex private keys, one per line
+        outfile: Binary stream receiving one record per valid key
+        errfile: Text stream receiving one message per bad line
+        flush_records: Number of lines derived and written per chunk
+        fmt: Output format (see record_io.FORMATS)
+        workers: Worker processes (1: derive in this process, 0: CPU count)
+        max_in_flight: Maximum outstanding chunks with several workers
+        stats: Optional dict filled with per-worker throughput totals
+        watch: Watch-list path; if given, only matching keys are written
+
+    Returns:
+        Tuple of (keys derived, lines rejected)
+    """
+    import record_io
+
+    outfile.write(record_io.header(fmt))
+    chunks = ((first_line_number, lines, fmt, watch)
+              for first_line_number, lines in read_chunks(infile, flush_records))
+    results = run_chunks(derive_chunk, chunks, workers, max_in_flight, stats)
+    return write_chunks(results, outfile, errfile)
+
+
+def derive_key_file(path, outfile, errfile, flush_records=STREAM_FLUSH_RECORDS,
+                    fmt='binary', workers=1, max_in_flight=None, stats=None, watch=None):
+    """
+    Derive every key of a memory-mapped binary key file.
+
+    In this process keys are read straight from the mapping; with several
+    workers each chunk is copied once to be sent to its worker.
+
+    Args:
+        path: Path to a file of raw 32-byte private keys
+        outfile: Binary stream receiving one record per valid key
+        errfile: Text stream receiving one message per bad key
+        flush_records: Number of keys derived and written per chunk
+        fmt: Output format (see record_io.FORMATS)
+        workers: Worker processes (1: derive in this process, 0: CPU count)
+        max_in_flight: Maximum outstanding chunks with several workers
+        stats: Optional dict filled with per-worker throughput totals
+        watch: Watch-list path; if given, only matching keys are written
+
+    Returns:
+        Tuple of (keys derived, keys rejected)
+    """
+    import record_io
+
+    outfile.write(record_io.header(fmt))
+    chunks = record_io.iter_key_file(path, flush_records)
+    if workers != 1:
+        chunks = ((first, bytes(chunk), fmt, watch) for first, chunk in chunks)
+    else:
+        chunks = ((first, chunk, fmt, watch) for first, chunk in chunks)
+    results = run_chunks(derive_key_chunk, chunks, workers, max_in_flight, stats)
+    return write_chunks(results, outfile, errfile)
+
+
+def print_worker_stats(stats, elapsed, errfile):
+    """Print per-worker and total throughput collected by run_chunks."""
+    total_keys = 0
+    for index, (pid, worker) in enumerate(sorted(stats.items()), 1):
+        rate = worker['keys'] / worker['busy'] if worker['busy'] else 0.0
+        print(f"Worker {index} (pid {pid}): {worker['keys']} keys in "
+              f"{worker['chunks']} chunks, {worker['busy']:.2f}s busy, "
+              f"{rate:.0f} keys/s", file=errfile)
+        total_keys += worker['keys']
+    rate = total_keys / elapsed if elapsed else 0.0
+    print(f"Total: {total_keys} keys in {elapsed:.2f}s, {rate:.0f} keys/s", file=errfile)
+
+
+def derive_range(start_key_bytes, count, outfile, stride=1,
+                 flush_records=STREAM_FLUSH_RECORDS, fmt='text', watch=None):
+    """
+    Derive records for the private keys start, start + stride, ...
+
+    Each public key is the previous one plus stride * G rather than a
+    fresh scalar multiplication, and points are normalized in batches of
+    `flush_records` with one shared inversion. Output matches
+    generate_compressed_pubkey / generate_wif / generate_address exactly.
+
+    Args:
+        start_key_bytes: First 32-byte private key
+        count: Number of keys to derive
+        outfile: Binary stream receiving one record per key
+        stride: Positive step between consecutive private keys
+        flush_records: Number of keys derived and written per batch
+        fmt: Output format (see record_io.FORMATS)
+        watch: Watch-list path; if given, only matching keys are written
+
+    Returns:
+        Number of keys derived
+
+    Raises:
+        ValueError: If the stride is not positive or the range leaves
+            the secp256k1 range
+    """
+    import record_io
+    import result_store
+
+    start = int.from_bytes(start_key_bytes, 'big')
+    pubkeys = ecmult.iter_range_pubkeys(start, count, stride, batch_size=flush_records)
+
+    def flush(first_index, private_keys, compressed_pubkeys):
+        indices = range(first_index, first_index + len(private_keys))
+        if watch is not None:
+            outfile.write(render_matches(private_keys, compressed_pubkeys, indices, fmt, watch))
+        else:
+            store = result_store.ResultStore(len(private_keys))
+            store.append_batch(private_keys, compressed_pubkeys)
+            outfile.write(record_io.render(store, indices, fmt))
+        outfile.flush()
+
+    outfile.write(record_io.header(fmt))
+    first_index = 0
+    private_keys = []
+    compressed_pubkeys = []
+    for index, compressed_pubkey in enumerate(pubkeys):
+        private_keys.append((start + index * stride).to_bytes(32, 'big'))
+        compressed_pubkeys.append(compressed_pubkey)
+        if len(private_keys) >= flush_records:
+            flush(first_index, private_keys, compressed_pubkeys)
+            first_index = index + 1
+            private_keys.clear()
+            compressed_pubkeys.clear()
+
+    if private_keys:
+        flush(first_index, private_keys, compressed_pubkeys)
+    outfile.flush()
+
+    return max(count, 0)
+
+
+def serve_persistent(infile, outfile):
+    """
+    Answer keys one line at a time for a persistent test runner.
+
+    Prints READY once the table is loaded. Each non-blank input line then
+    gets the single-key output (three lines) followed by an empty line, or
+    an "Error: ..." line followed by an empty line. Output is flushed
+    after every answer.
+
+    Args:
+        infile: Text stream of hex private keys, one per line
+        outfile: Text stream receiving the answers
+    """
+    # Many keys will follow: load the full-size table up front
+    ecmult.get_table()
+    outfile.write("READY\n")
+    outfile.flush()
+    for line in infile:
+        private_key_hex = line.strip()
+        if not private_key_hex:
+            continue
+        try:
+            private_key_bytes = parse_private_key(private_key_hex)
+        except ValueError as e:
+            outfile.write(f"Error: {e}\n\n")
+        else:
+            compressed_pubkey = generate_compressed_pubkey(private_key_bytes)
+            outfile.write(f"Compressed PubKey: {compressed_pubkey.hex().upper()}\n"
+                          f"WIF: {generate_wif(private_key_bytes)}\n"
+                          f"Address: {generate_address(compressed_pubkey)}\n\n")
+        outfile.flush()
+
+
+def serve_daemon(args):
+    """
+    Run the derivation daemon (see derive_daemon.py) until SIGINT/SIGTERM.
+
+    Returns:
+        Process exit status
+    """
+    import derive_daemon
+
+    ecmult.get_table()
+    try:
+        derive_daemon.serve(args.serve, derive_results, parse_private_key,
+                            batch_size=args.batch_size,
+                            batch_wait=args.batch_wait_ms / 1e3,
+                            max_queue=args.max_queue)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    import argparse
+    import record_io
+    import instrument
+    import derive_daemon
+
+    parser = argparse.ArgumentParser(description="Bitcoin key derivation")
+    parser.add_argument('--persistent', action='store_true',
+                        help="answer one key per stdin line until EOF (test runner protocol)")
+    parser.add_argument('--serve', metavar='ADDRESS',
+                        help="run as a daemon on unix:PATH or tcp:HOST:PORT")
+    parser.add_argument('--batch-size', type=int, default=derive_daemon.DEFAULT_BATCH_SIZE,
+                        help="maximum keys per daemon batch")
+    parser.add_argument('--batch-wait-ms', type=float, default=derive_daemon.DEFAULT_BATCH_WAIT_MS,
+                        help="extra time the daemon waits to fill a batch")
+    parser.add_argument('--max-queue', type=int, default=derive_daemon.DEFAULT_MAX_QUEUE,
+                        help="queued keys before the daemon stops reading requests")
+    parser.add_argument('--stream', action='store_true',
+                        help="derive newline-delimited keys from stdin, one record per key")
+    parser.add_argument('--key-file', metavar='PATH',
+                        help="derive every key of a binary file of raw 32-byte keys")
+    parser.add_argument('--range', nargs=2, metavar=('START', 'COUNT'),
+                        help="derive COUNT consecutive keys from the hex key START")
+    parser.add_argument('--stride', type=int, default=1,
+                        help="step between consecutive keys in range mode")
+    parser.add_argument('--format', choices=record_io.FORMATS, default=None,
+                        help="bulk output format (default: text, binary for --key-file)")
+    parser.add_argument('--output', metavar='PATH',
+                        help="write bulk output to PATH instead of stdout")
+    parser.add_argument('--flush-records', type=int, default=STREAM_FLUSH_RECORDS,
+                        help="keys derived and written per batch in bulk modes")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes for --stream/--key-file (0: one per CPU)")
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help="maximum outstanding chunks with several workers")
+    parser.add_argument('--watch', metavar='PATH', default=None,
+                        help="only output keys whose address is in this watch list "
+                             "(index from watchlist.py, or one address per line)")
+    parser.add_argument('--stats', action='store_true',
+                        help="print per-worker throughput on stderr after a bulk run")
+    parser.add_argument('--backend', choices=ecmult.BACKENDS, default=None,
+                        help="scalar multiplication backend (default: ECMULT_BACKEND or table)")
+    parser.add_argument('--metrics', choices=instrument.FORMATS, default=None,
+                        help="collect per-stage metrics and dump them at exit and on SIGUSR1")
+    parser.add_argument('--metrics-file', metavar='PATH', default=None,
+                        help="write metrics to PATH instead of stderr")
+    parser.add_argument('--profile', metavar='REPORT', default=None,
+                        help="run a bulk mode under cProfile/tracemalloc and write REPORT")
+    parser.add_argument('--self-timing', action='store_true',
+                        help="report import/table/compute time of a single-key run on stderr")
+    return parser.parse_args(argv)
+
+
+def run_bulk(args, outfile):
+    """
+    Run the bulk mode selected on the command line.
+
+    Returns:
+        Process exit status
+    """
+    flush_records = max(1, args.flush_records)
+    stats = {} if args.stats else None
+    started = time.perf_counter()
+
+    try:
+        if args.watch:
+            import watchlist
+            # Fails early on a bad watch list; a text list is indexed once
+            # here so worker processes map the index instead of re-decoding it
+            watch_index = watchlist.index_path(args.watch)
+        else:
+            import contextlib
+            watch_index = contextlib.nullcontext()
+
+        with watch_index as watch:
+            if args.range:
+                start_hex, count = args.range
+                fmt = args.format or 'text'
+                derive_range(parse_private_key(start_hex), int(count), outfile,
+                             stride=args.stride, flush_records=flush_records, fmt=fmt,
+                             watch=watch)
+                return 0
+
+            if args.key_file:
+                _, rejected = derive_key_file(args.key_file, outfile, sys.stderr,
+                                              flush_records=flush_records,
+                                              fmt=args.format or 'binary',
+                                              workers=max(0, args.workers),
+                                              max_in_flight=args.max_in_flight,
+                                              stats=stats, watch=watch)
+            else:
+                _, rejected = stream_keys(sys.stdin, outfile, sys.stderr,
+                                          flush_records=flush_records,
+                                          fmt=args.format or 'text',
+                                          workers=max(0, args.workers),
+                                          max_in_flight=args.max_in_flight,
+                                          stats=stats, watch=watch)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if stats is not None:
+        print_worker_stats(stats, time.perf_counter() - started, sys.stderr)
+    return 1 if rejected else 0
+
+
+def enable_metrics(fmt, path=None):
+    """Instrument the derivation stages (see instrument.py)."""
+    import record_io
+    import instrument
+    import result_store
+    this_module = sys.modules[__name__]
+    instrument.enable([
+        (this_module, 'generate_compressed_pubkey', False),
+        (this_module, 'generate_wif', False),
+        (this_module, 'generate_address', False),
+        (this_module, 'generate_compressed_pubkeys', True),
+        (this_module, 'derive_results', True),
+        (hashing, 'hash160_many', False),
+        (hashing, 'checksum_many', False),
+        # Bulk modes render WIFs and addresses from the result store
+        (result_store.ResultsView, 'wif', False),
+        (result_store.ResultsView, 'address', False),
+        (result_store.ResultsView, 'wifs', True),
+        (result_store.ResultsView, 'addresses', True),
+        (record_io, 'render', True),
+    ], fmt, path)
+
+
+def print_self_timing(phases, errfile):
+    """
+    Print the time spent in each phase of a single-key run.
+
+    Args:
+        phases: List of (name, seconds) in run order
+        errfile: Text stream for the report
+    """
+    total = sum(seconds for _, seconds in phases)
+    report = ', '.join(f"{name} {seconds * 1e3:.2f}" for name, seconds in phases)
+    print(f"Self-timing (ms): {report}, total {total * 1e3:.2f} "
+          f"(after interpreter start-up)", file=errfile)
+
+
+def main():
+    """
+    Main function: Read from stdin, generate WIF and address, print to stdout.
+    """
+    # A plain single-key run skips argument parsing and the imports it needs
+    argv = sys.argv[1:]
+    self_timing = argv == ['--self-timing']
+    if (argv and not self_timing) or os.environ.get('DERIVE_METRICS'):
+        import instrument
+
+        args = parse_args(argv)
+        self_timing = args.self_timing
+
+        if args.backend:
+            ecmult.set_backend(args.backend)
+
+        metrics = args.metrics or instrument.env_format()
+        if metrics:
+            enable_metrics(metrics, args.metrics_file or os.environ.get('DERIVE_METRICS_FILE'))
+
+        if args.persistent:
+            serve_persistent(sys.stdin, sys.stdout)
+            sys.exit(0)
+
+        if args.serve:
+            sys.exit(serve_daemon(args))
+
+        if args.stream or args.key_file or args.range:
+            profile = args.profile or os.environ.get('DERIVE_PROFILE')
+            if profile:
+                import functools
+                run = functools.partial(instrument.profile_call, profile, run_bulk)
+            else:
+                run = run_bulk
+            if args.output:
+                with open(args.output, 'wb') as outfile:
+                    status = run(args, outfile)
+            else:
+                status = run(args, sys.stdout.buffer)
+            sys.exit(status)
+    parsed = time.perf_counter()
+
+    # Read private key from stdin
+    try:
+        private_key_bytes = parse_private_key(sys.stdin.read().strip())
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    read = time.perf_counter()
+
+    if self_timing and ecmult.get_backend() == 'table':
+        ecmult.single_key_table()
+    loaded = time.perf_counter()
+
+    compressed_pubkey = generate_compressed_pubkey(private_key_bytes)
+    wif = generate_wif(private_key_bytes)
+    address = generate_address(compressed_pubkey)
+    computed = time.perf_counter()
+
+    # Output in required format
+    print(f"Compressed PubKey: {compressed_pubkey.hex().upper()}")
+    print(f"WIF: {wif}")
+    print(f"Address: {address}")
+
+    if self_timing:
+        sys.stdout.flush()
+        print_self_timing([('imports', _IMPORTED - _STARTED),
+                           ('arguments', parsed - _IMPORTED),
+                           ('input', read - parsed),
+                           ('table', loaded - read),
+                           ('compute', computed - loaded),
+                           ('output', time.perf_counter() - computed)], sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Key Derivation Daemon Client
+============================
+
+Client for the derivation daemon (derive_daemon.py, started with
+derive_cli.py --serve ADDRESS) with connection pooling.
+
+Connections are opened on demand, up to `pool_size` at a time, and are
+returned to the pool after every call, so callers in many threads share
+a few long-lived connections instead of connecting per key. A pooled
+connection that turns out to be dead (for example after a daemon
+restart) is replaced and the call retried once.
+
+derive_many() pipelines its keys over one connection in windows of
+`window` requests, which lets the daemon derive them in large batches.
+
+Usage:
+    from derive_client import DeriveClient
+
+    with DeriveClient('unix:/tmp/derive.sock') as client:
+        result = client.derive(private_key_hex)       # {'pubkey', 'wif', 'address'}
+        results = client.derive_many(private_keys_hex)
+        stats = client.stats()
+
+    python3 derive_client.py unix:/tmp/derive.sock <hex key> [<hex key> ...]
+    python3 derive_client.py tcp:127.0.0.1:8765 --stats
+"""
+
+import sys
+import json
+import socket
+import threading
+
+from derive_daemon import parse_address
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_WINDOW = 256
+
+
+class DeriveClient:
+    """Thread-safe daemon client over a pool of persistent connections."""
+
+    def __init__(self, address, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 window=DEFAULT_WINDOW):
+        """
+        Args:
+            address: Daemon address, "unix:PATH" or "tcp:HOST:PORT"
+            pool_size: Maximum open connections; callers beyond it wait
+            timeout: Socket timeout in seconds for connecting and replies
+            window: Requests sent ahead before reading replies in derive_many
+        """
+        self._family, self._address = parse_address(address)
+        self._slots = threading.BoundedSemaphore(max(1, pool_size))
+        self._idle = []
+        self._lock = threading.Lock()
+        self.timeout = timeout
+        self.window = max(1, window)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _connect(self):
+        sock = socket.socket(self._family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self._address)
+        except OSError:
+            sock.close()
+            raise
+        if self._family != getattr(socket, 'AF_UNIX', None):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock, sock.makefile('rb')
+
+    @staticmethod
+    def _discard(connection):
+        sock, rfile = connection
+        rfile.close()
+        sock.close()
+
+    def _exchange(self, connection, requests):
+        """Send request lines in windows and read one reply line for each."""
+        sock, rfile = connection
+        replies = []
+        for first in range(0, len(requests), self.window):
+            window = requests[first:first + self.window]
+            sock.sendall(b''.join(window))
+            for _ in window:
+                line = rfile.readline()
+                if not line.endswith(b'\n'):
+                    raise ConnectionError("Daemon closed the connection")
+                replies.append(json.loads(line))
+        return replies
+
+    def _call(self, requests):
+        """
+        Run request lines over a pooled connection.
+
+        Returns:
+            List of decoded JSON replies in request order
+
+        Raises:
+            ConnectionError: If the daemon cannot be reached or fails mid-call
+        """
+        with self._slots:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            retry = connection is not None
+            while True:
+                try:
+                    if connection is None:
+                        connection = self._connect()
+                    replies = self._exchange(connection, requests)
+                    break
+                except (OSError, ValueError) as e:
+                    if connection is not None:
+                        self._discard(connection)
+                        connection = None
+                    if retry:
+                        retry = False
+                        continue
+                    raise ConnectionError(f"Daemon request failed: {e}") from e
+            with self._lock:
+                self._idle.append(connection)
+            return replies
+
+    def derive_many(self, private_keys_hex):
+        """
+        Derive many keys over one pipelined connection.
+
+        Args:
+            private_keys_hex: Sequence of hex private keys
+
+        Returns:
+            List of dicts in input order, each with 'pubkey', 'wif' and
+            'address', or with 'error' for a rejected key
+        """
+        requests = [json.dumps({'key': key}).encode('utf-8') + b'\n' for key in private_keys_hex]
+        return self._call(requests)
+
+    def derive(self, private_key_hex):
+        """
+        Derive one key.
+
+        Returns:
+            Dict with 'pubkey', 'wif' and 'address'
+
+        Raises:
+            ValueError: If the daemon rejects the key
+        """
+        reply = self.derive_many([private_key_hex])[0]
+        if 'error' in reply:
+            raise ValueError(reply['error'])
+        return reply
+
+    def stats(self):
+        """Return the daemon's connection, queue and batch counters."""
+        return self._call([b'{"op": "stats"}\n'])[0]['stats']
+
+    def close(self):
+        """Close the idle pooled connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._discard(connection)
+
+
+def main():
+    """Command line entry point: derive keys or print daemon stats."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query a key derivation daemon")
+    parser.add_argument('address', help="daemon address (unix:PATH or tcp:HOST:PORT)")
+    parser.add_argument('keys', nargs='*', help="hex private keys ('-' reads them from stdin)")
+    parser.add_argument('--stats', action='store_true', help="print the daemon's stats as JSON")
+    args = parser.parse_args()
+
+    keys = args.keys
+    if keys == ['-']:
+        keys = [line.strip() for line in sys.stdin if line.strip()]
+
+    status = 0
+    try:
+        with DeriveClient(args.address) as client:
+            if args.stats:
+                print(json.dumps(client.stats(), indent=2))
+            for reply in client.derive_many(keys) if keys else []:
+                if 'error' in reply:
+                    print(f"Error: {reply['error']}", file=sys.stderr)
+                    status = 1
+                else:
+                    print(f"{reply['pubkey']}\t{reply['wif']}\t{reply['address']}")
+    except (ValueError, ConnectionError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        status = 1
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
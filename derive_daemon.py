@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Key Derivation Daemon
+=====================
+
+Serves key derivation over a Unix domain socket or a loopback TCP port
+(other TCP hosts are refused: the protocol has no authentication),
+so callers pay for interpreter start-up and the curve table once instead
+of once per key. Started with:
+
+    python3 derive_cli.py --serve unix:/tmp/derive.sock
+    python3 derive_cli.py --serve tcp:127.0.0.1:8765
+
+Protocol: newline-delimited requests on a stream connection. Every
+request gets exactly one reply line, in request order, and requests may
+be pipelined without waiting for the replies.
+
+    <hex private key>           <pubkey hex>\t<wif>\t<address>
+                                or Error: <message>
+    {"id": 7, "key": "<hex>"}   {"id": 7, "pubkey": ..., "wif": ..., "address": ...}
+                                or {"id": 7, "error": "<message>"}
+    {"op": "stats"}             {"stats": {...}}
+
+The "id" field is optional and echoed back unchanged.
+
+Keys from all connections go through one bounded queue. A single batcher
+thread takes everything queued (up to the batch size) and derives it as
+one batch through the bulk paths: one shared field inversion for all
+public keys and buffer-based Hash160s and checksums. While a batch is
+being derived new requests accumulate, so batches grow with load without
+delaying a lone request; a batch wait adds a fixed coalescing window on
+top.
+
+When the queue is full, connection threads stop reading their sockets
+until it drains, so backpressure reaches clients through the socket
+buffers instead of growing memory. The stats reply reports request and
+batch counters, the current and peak queue depth, how many requests had
+to wait for queue space, and a histogram of batch derivation times.
+
+See derive_client.py for a client with connection pooling.
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import queue
+import signal
+import socket
+import ipaddress
+import threading
+import socketserver
+from concurrent.futures import Future
+
+import instrument
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_BATCH_WAIT_MS = 0.0
+DEFAULT_MAX_QUEUE = 4096
+
+# Replies a connection may have outstanding before its reader pauses
+CONNECTION_PIPELINE = 1024
+
+
+def is_loopback(host):
+    """Check whether a TCP host is "localhost" or a loopback IP address."""
+    if host.lower() == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def parse_address(address):
+    """
+    Parse a daemon address.
+
+    The daemon has no authentication, so TCP hosts must be loopback:
+    "localhost", an address in 127.0.0.0/8 or ::1.
+
+    Args:
+        address: "unix:PATH" or "tcp:HOST:PORT"
+
+    Returns:
+        Tuple of (socket family, address for bind or connect)
+
+    Raises:
+        ValueError: If the address is malformed, unsupported or not loopback
+    """
+    kind, _, rest = address.partition(':')
+    if kind == 'unix' and rest:
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError("Unix domain sockets are not supported on this platform")
+        return socket.AF_UNIX, rest
+    if kind == 'tcp':
+        host, _, port = rest.rpartition(':')
+        host = host.strip('[]')
+        if host and port.isdigit():
+            if not is_loopback(host):
+                raise ValueError(f"Refusing non-loopback TCP host {host}: "
+                                 "use 127.0.0.1, ::1 or localhost")
+            family = socket.AF_INET6 if ':' in host else socket.AF_INET
+            return family, (host, int(port))
+    raise ValueError(f"Invalid address: {address} (expected unix:PATH or tcp:HOST:PORT)")
+
+
+def _failed(message):
+    """Return a Future that already failed with ValueError(message)."""
+    future = Future()
+    future.set_exception(ValueError(message))
+    return future
+
+
+class Batcher:
+    """Coalesces keys queued by all connections into micro-batches."""
+
+    def __init__(self, derive, batch_size=DEFAULT_BATCH_SIZE,
+                 batch_wait=DEFAULT_BATCH_WAIT_MS / 1e3, max_queue=DEFAULT_MAX_QUEUE):
+        """
+        Args:
+            derive: Function deriving a list of 32-byte keys into a ResultsView
+            batch_size: Maximum keys per batch
+            batch_wait: Seconds to wait for more keys after the first of a batch
+            max_queue: Maximum queued keys before submitters block
+        """
+        self._derive = derive
+        self._queue = queue.Queue(max(1, max_queue))
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = max(0.0, batch_wait)
+
+        self._lock = threading.Lock()
+        self.batch_metrics = instrument.StageMetrics()
+        self.requests = 0
+        self.throttled = 0
+        self.failed_batches = 0
+        self.peak_depth = 0
+        self.max_batch = 0
+
+        self._thread = threading.Thread(target=self._run, name='derive-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, private_key):
+        """
+        Queue a key for derivation, blocking while the queue is full.
+
+        Args:
+            private_key: Validated 32-byte private key
+
+        Returns:
+            Future of (compressed pubkey hex, WIF, address)
+        """
+        future = Future()
+        item = (private_key, future)
+        try:
+            self._queue.put_nowait(item)
+            throttled = 0
+        except queue.Full:
+            self._queue.put(item)
+            throttled = 1
+        depth = self._queue.qsize()
+        with self._lock:
+            self.requests += 1
+            self.throttled += throttled
+            self.peak_depth = max(self.peak_depth, depth)
+        return future
+
+    def _next_batch(self):
+        """Block for one key, then take whatever else is queued."""
+        get = self._queue.get
+        batch = [get()]
+        deadline = time.perf_counter() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(get(timeout=remaining) if remaining > 0 else get(block=False))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        clock = time.perf_counter
+        while True:
+            batch = self._next_batch()
+            start = clock()
+            try:
+                store = self._derive([key for key, _ in batch])
+                answers = [(store.pubkey(i).hex().upper(), store.wif(i), store.address(i))
+                           for i in range(len(batch))]
+            except Exception as e:
+                with self._lock:
+                    self.failed_batches += 1
+                for _, future in batch:
+                    future.set_exception(ValueError(f"Derivation failed: {e}"))
+                continue
+            with self._lock:
+                self.batch_metrics.observe(clock() - start, len(batch))
+                self.max_batch = max(self.max_batch, len(batch))
+            for (_, future), answer in zip(batch, answers):
+                future.set_result(answer)
+
+    def stats(self):
+        """Return queue and batch counters as a dict."""
+        with self._lock:
+            metrics = self.batch_metrics
+            return {
+                'requests': self.requests,
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'peak_queue_depth': self.peak_depth,
+                'throttled': self.throttled,
+                'batches': metrics.calls,
+                'batched_keys': metrics.items,
+                'mean_batch': round(metrics.items / metrics.calls, 2) if metrics.calls else 0.0,
+                'max_batch': self.max_batch,
+                'failed_batches': self.failed_batches,
+                'batch_seconds': metrics.to_dict(),
+            }
+
+
+def _text_reply(future):
+    try:
+        pubkey, wif, address = future.result()
+    except ValueError as e:
+        return f"Error: {e}\n"
+    return f"{pubkey}\t{wif}\t{address}\n"
+
+
+def _json_reply(request_id):
+    def reply(future):
+        message = {} if request_id is None else {'id': request_id}
+        try:
+            message['pubkey'], message['wif'], message['address'] = future.result()
+        except ValueError as e:
+            message['error'] = str(e)
+        return json.dumps(message) + '\n'
+    return reply
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One connection: this thread reads requests, a second one writes replies."""
+
+    wbufsize = 64 * 1024
+
+    def setup(self):
+        self.disable_nagle_algorithm = self.server.address_family != getattr(socket, 'AF_UNIX', None)
+        super().setup()
+
+    def handle(self):
+        server = self.server
+        pending = queue.Queue(CONNECTION_PIPELINE)
+        writer = threading.Thread(target=self._write_replies, args=(pending,), daemon=True)
+        server.connection_opened()
+        writer.start()
+        try:
+            for line in self.rfile:
+                request = line.strip()
+                if request:
+                    pending.put(server.dispatch(request))
+        except OSError:
+            pass
+        finally:
+            pending.put(None)
+            writer.join()
+            server.connection_closed()
+
+    def _write_replies(self, pending):
+        """Write replies in request order, flushing whenever the next one is not ready."""
+        wfile = self.wfile
+        connected = True
+        while True:
+            entry = pending.get()
+            if entry is None:
+                break
+            future, reply = entry
+            if not connected:
+                continue
+            try:
+                if not future.done():
+                    wfile.flush()
+                wfile.write(reply(future).encode('utf-8'))
+                if pending.empty():
+                    wfile.flush()
+            except OSError:
+                connected = False  # keep draining so the reader never blocks
+        if connected:
+            try:
+                wfile.flush()
+            except OSError:
+                pass
+
+
+class DeriveServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Threaded stream server feeding one shared Batcher."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, derive, parse_key, **batch_options):
+        """
+        Args:
+            address: "unix:PATH" or "tcp:HOST:PORT"
+            derive: Function deriving a list of 32-byte keys into a ResultsView
+            parse_key: Function turning a hex string into a validated
+                32-byte key, raising ValueError otherwise
+            **batch_options: batch_size, batch_wait, max_queue (see Batcher)
+        """
+        self.address_family, bind_address = parse_address(address)
+        self.unix_path = bind_address if self.address_family == getattr(socket, 'AF_UNIX', None) else None
+        if self.unix_path:
+            _remove_stale_socket(self.unix_path)
+
+        self.parse_key = parse_key
+        self.batcher = Batcher(derive, **batch_options)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.total_connections = 0
+        super().__init__(bind_address, _Handler)
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections += 1
+            self.total_connections += 1
+
+    def connection_closed(self):
+        with self._lock:
+            self.connections -= 1
+
+    def stats(self):
+        """Return connection, queue and batch counters as a dict."""
+        with self._lock:
+            connections = {'connections': self.connections,
+                           'total_connections': self.total_connections}
+        return {'pid': os.getpid(), 'uptime_seconds': round(time.time() - self.started, 3),
+                **connections, **self.batcher.stats()}
+
+    def dispatch(self, request):
+        """
+        Parse one request line and start answering it.
+
+        Args:
+            request: Stripped request line as bytes
+
+        Returns:
+            Tuple of (Future, function rendering the reply line from it)
+        """
+        if not request.startswith(b'{'):
+            try:
+                return self.batcher.submit(self.parse_key(request.decode('ascii', 'replace'))), _text_reply
+            except ValueError as e:
+                return _failed(str(e)), _text_reply
+
+        try:
+            message = json.loads(request)
+            if not isinstance(message, dict):
+                raise ValueError("Request must be a JSON object")
+        except ValueError as e:
+            return _failed(f"Invalid request: {e}"), _json_reply(None)
+
+        request_id = message.get('id')
+        if message.get('op') == 'stats':
+            future = Future()
+            future.set_result(self.stats())
+            return future, lambda f: json.dumps({'stats': f.result()}) + '\n'
+        if 'op' in message:
+            return _failed(f"Unknown op: {message['op']}"), _json_reply(request_id)
+
+        key = message.get('key')
+        if not isinstance(key, str):
+            return _failed("Request needs a hex \"key\" string"), _json_reply(request_id)
+        try:
+            return self.batcher.submit(self.parse_key(key)), _json_reply(request_id)
+        except ValueError as e:
+            return _failed(str(e)), _json_reply(request_id)
+
+    def server_close(self):
+        super().server_close()
+        if self.unix_path:
+            try:
+                os.unlink(self.unix_path)
+            except OSError:
+                pass
+
+
+def _remove_stale_socket(path):
+    """Remove a leftover socket file at `path` unless a daemon still answers on it."""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return  # let bind() report the conflict
+    except FileNotFoundError:
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise OSError(f"A daemon is already listening on {path}")
+    finally:
+        probe.close()
+
+
+def serve(address, derive, parse_key, errfile=sys.stderr, **batch_options):
+    """
+    Run the daemon until SIGINT or SIGTERM.
+
+    Args:
+        address: "unix:PATH" or "tcp:HOST:PORT"
+        derive: Function deriving a list of 32-byte keys into a ResultsView
+        parse_key: Function validating a hex key (raises ValueError)
+        errfile: Text stream for the start-up message
+        **batch_options: batch_size, batch_wait, max_queue (see Batcher)
+    """
+    server = DeriveServer(address, derive, parse_key, **batch_options)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    print(f"Serving key derivation on {address} (pid {os.getpid()})", file=errfile)
+    errfile.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,778 @@
+#!/usr/bin/env python3
+"""
+Fixed-Base secp256k1 Scalar Multiplication
+==========================================
+
+Computes public keys P = k * G with a precomputed window table of
+multiples of the generator G.
+
+The scalar k is split into w-bit windows. For window i the table holds
+d * 2^(w*i) * G for every digit d, so k * G is the sum of one table entry
+per window: no doublings are needed at multiplication time. Additions are
+done in Jacobian coordinates and a single modular inversion converts the
+result back to affine coordinates. Bulk derivation shares that inversion
+across a whole batch (Montgomery's simultaneous inversion).
+
+Tables are built lazily on first use and cached on disk as fixed-width
+raw coordinates, so later processes load them instead of rebuilding.
+Cache files live in ECMULT_CACHE_DIR (default: a per-user cache directory
+outside the repository, see cache_paths.py; set it to an empty string to
+disable caching). ECMULT_TABLE_CACHE names an explicit file for the
+default 8-bit table. Every cell of a loaded table is checked before
+use: the generator, the chain of window bases (recomputed by doubling)
+and, for every other cell, that it is the previous cell plus the
+window base (checked without inversions). A missing, stale, corrupt or wrong cache
+file is rebuilt transparently.
+
+Single-key derivation uses a 4-bit table (80 KB, a few ms to load)
+unless the 8-bit batch table is already in memory: for one key, loading
+the larger table costs more than the extra additions it saves.
+
+Two multiplication backends are available, selected with ECMULT_BACKEND
+or set_backend():
+
+    table    fixed-base window table (default, fastest)
+    ladder   Montgomery ladder over a fixed 257-bit scalar with complete
+             projective formulas and mask-based conditional swaps: every
+             key, edge scalars included, runs the same sequence of field
+             operations with no branch or table index on its bits. Field
+             elements are reduced with the special form of p (2^256 =
+             0x1000003D1 mod p). Much slower than the table. CPython
+             integer arithmetic still takes time that depends on operand
+             sizes, so this removes key-dependent control flow, not every
+             timing difference.
+
+Run `python3 ecmult.py --self-check [COUNT]` for a randomized differential
+check of both backends against the ecdsa package (when installed) and a
+plain affine double-and-add reference.
+
+Used by derive_cli.py; the validator computes its expected
+outputs independently (see reference_engine.py).
+"""
+
+import os
+import hashlib
+
+import cache_paths
+
+# secp256k1 domain parameters
+P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+GX = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
+GY = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+
+DEFAULT_WINDOW = 8
+SINGLE_KEY_WINDOW = 4
+
+DEFAULT_CACHE_DIR = str(cache_paths.user_cache_dir('ecmult'))
+
+BACKENDS = ('table', 'ladder')
+
+# Special form of the field prime: p = 2^256 - _P_FOLD
+_P_FOLD = 0x1000003D1
+_MASK256 = (1 << 256) - 1
+# 3 * b for the curve equation y^2 = x^3 + 7
+_B3 = 21
+
+_CACHE_MAGIC = b'ECMT3'
+_COORD_BYTES = 32
+
+
+def batch_inverse(values, p=P):
+    """
+    Invert many field elements with a single modular inversion.
+
+    Uses Montgomery's simultaneous inversion trick: prefix products are
+    inverted once and unwound back to the individual inverses.
+
+    Args:
+        values: Sequence of non-zero integers modulo p
+        p: Field modulus
+
+    Returns:
+        List of inverses in the same order as `values`
+    """
+    count = len(values)
+    if count == 0:
+        return []
+
+    prefix = [0] * count
+    acc = 1
+    for i, value in enumerate(values):
+        prefix[i] = acc
+        acc = acc * value % p
+
+    inv = pow(acc, -1, p)
+    result = [0] * count
+    for i in range(count - 1, -1, -1):
+        result[i] = prefix[i] * inv % p
+        inv = inv * values[i] % p
+    return result
+
+
+def jacobian_double(point):
+    """
+    Double a Jacobian point (X, Y, Z) on y^2 = x^3 + 7.
+
+    Args:
+        point: Jacobian point, or None for the point at infinity
+
+    Returns:
+        Jacobian point 2 * point, or None for infinity
+    """
+    if point is None:
+        return None
+    x1, y1, z1 = point
+    if y1 == 0:
+        return None
+
+    a = x1 * x1 % P
+    b = y1 * y1 % P
+    c = b * b % P
+    d = 2 * ((x1 + b) * (x1 + b) - a - c) % P
+    e = 3 * a % P
+    x3 = (e * e - 2 * d) % P
+    y3 = (e * (d - x3) - 8 * c) % P
+    z3 = 2 * y1 * z1 % P
+    return (x3, y3, z3)
+
+
+def jacobian_add_affine(point, x2, y2):
+    """
+    Add an affine point (x2, y2) to a Jacobian point.
+
+    Args:
+        point: Jacobian point, or None for the point at infinity
+        x2: Affine x-coordinate of the second point
+        y2: Affine y-coordinate of the second point
+
+    Returns:
+        Jacobian point sum, or None for infinity
+    """
+    if point is None:
+        return (x2, y2, 1)
+    x1, y1, z1 = point
+
+    z1z1 = z1 * z1 % P
+    u2 = x2 * z1z1 % P
+    s2 = y2 * z1 * z1z1 % P
+    h = (u2 - x1) % P
+    r = (s2 - y1) % P
+    if h == 0:
+        if r == 0:
+            return jacobian_double(point)
+        return None
+
+    hh = h * h % P
+    hhh = h * hh % P
+    v = x1 * hh % P
+    x3 = (r * r - hhh - 2 * v) % P
+    y3 = (r * (v - x3) - y1 * hhh) % P
+    z3 = z1 * h % P
+    return (x3, y3, z3)
+
+
+def to_affine(point):
+    """
+    Convert a Jacobian point to affine coordinates.
+
+    Args:
+        point: Jacobian point (X, Y, Z) with Z != 0
+
+    Returns:
+        Affine point (x, y)
+    """
+    x, y, z = point
+    z_inv = pow(z, -1, P)
+    z_inv2 = z_inv * z_inv % P
+    return (x * z_inv2 % P, y * z_inv2 * z_inv % P)
+
+
+def encode_compressed(x, y):
+    """
+    Serialize an affine point as a 33-byte compressed public key.
+
+    Args:
+        x: Affine x-coordinate
+        y: Affine y-coordinate
+
+    Returns:
+        0x02/0x03 parity prefix followed by the 32-byte x-coordinate
+    """
+    return (b'\x03' if y & 1 else b'\x02') + x.to_bytes(32, 'big')
+
+
+class FixedBaseTable:
+    """Window table of multiples of G for fixed-base scalar multiplication."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        if not 1 <= window <= 16:
+            raise ValueError("Window width must be between 1 and 16 bits")
+        self.window = window
+        self.windows = (256 + window - 1) // window
+        self.mask = (1 << window) - 1
+        # rows[i][d - 1] is the affine point d * 2^(window*i) * G
+        self.rows = None
+
+    def build(self):
+        """Compute every table row from the generator."""
+        digits = self.mask
+        base = (GX, GY)
+        rows = []
+        for _ in range(self.windows):
+            jacobian_row = []
+            acc = None
+            for _ in range(digits):
+                acc = jacobian_add_affine(acc, base[0], base[1])
+                jacobian_row.append(acc)
+
+            rows.append(normalize_batch(jacobian_row))
+
+            # Next window base is 2^window times this one, i.e. one past the last digit
+            base = to_affine(jacobian_add_affine(acc, base[0], base[1]))
+
+        self.rows = rows
+        return self
+
+    def multiply(self, k):
+        """
+        Compute k * G in Jacobian coordinates.
+
+        Args:
+            k: Scalar in the range [1, n-1]
+
+        Returns:
+            Jacobian point (X, Y, Z)
+        """
+        if not 0 < k < N:
+            raise ValueError("Scalar out of secp256k1 range")
+        if self.rows is None:
+            self.build()
+
+        window = self.window
+        mask = self.mask
+        acc = None
+        for row in self.rows:
+            digit = k & mask
+            if digit:
+                x2, y2 = row[digit - 1]
+                acc = jacobian_add_affine(acc, x2, y2)
+            k >>= window
+            if not k:
+                break
+        return acc
+
+    def _cache_header(self):
+        return _CACHE_MAGIC + bytes([self.window])
+
+    def save(self, path):
+        """
+        Write the table to `path` atomically.
+
+        The file holds a header, a SHA-256 digest of the body and every
+        point as 32-byte big-endian x and y, row by row.
+        """
+        if self.rows is None:
+            self.build()
+        body = b''.join(x.to_bytes(_COORD_BYTES, 'big') + y.to_bytes(_COORD_BYTES, 'big')
+                        for row in self.rows for x, y in row)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self._cache_header())
+            f.write(hashlib.sha256(body).digest())
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """
+        Read the table from `path`.
+
+        The SHA-256 digest only detects corruption; the decoded rows are
+        accepted only if verify() confirms every cell.
+
+        Returns:
+            True if a valid table for this window width was loaded
+        """
+        header = self._cache_header()
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+
+        if not data.startswith(header):
+            return False
+        digest = data[len(header):len(header) + 32]
+        body = memoryview(data)[len(header) + 32:]
+        point_bytes = 2 * _COORD_BYTES
+        if (len(body) != self.windows * self.mask * point_bytes
+                or hashlib.sha256(body).digest() != digest):
+            return False
+
+        from_bytes = int.from_bytes
+        coords = [from_bytes(body[offset:offset + _COORD_BYTES], 'big')
+                  for offset in range(0, len(body), _COORD_BYTES)]
+        points = list(zip(coords[0::2], coords[1::2]))
+        rows = [points[start:start + self.mask]
+                for start in range(0, len(points), self.mask)]
+        if not self.verify(rows):
+            return False
+        self.rows = rows
+        return True
+
+    def verify(self, rows):
+        """
+        Check every cell of the table rows.
+
+        Checks that rows[0][0] is G and that every window base
+        rows[i+1][0] is 2^window times rows[i][0], which pins every base
+        to 2^(window*i) * G. Every other cell C = rows[i][d-1] must then be
+        A + B for A = rows[i][d-2] and B = rows[i][0]: C lies on the curve,
+        its negation lies on the line through A and B (the tangent at B
+        when A = B) and is neither A nor B. Together with the bases this
+        fixes every cell to d * 2^(window*i) * G.
+
+        Returns:
+            True if every check passes
+        """
+        if rows[0][0] != (GX, GY):
+            return False
+
+        def same(point, affine):
+            # Jacobian (X, Y, Z) equals affine (x, y) iff X = x*Z^2 and Y = y*Z^3
+            if point is None:
+                return False
+            x, y, z = point
+            zz = z * z % P
+            return (x - affine[0] * zz) % P == 0 and (y - affine[1] * zz * z) % P == 0
+
+        for row, next_row in zip(rows, rows[1:]):
+            point = (row[0][0], row[0][1], 1)
+            for _ in range(self.window):
+                point = jacobian_double(point)
+            if not same(point, next_row[0]):
+                return False
+
+        for row in rows:
+            x0, y0 = row[0]
+            # Slope numerator and denominator of the tangent at B
+            num, den = 3 * x0 * x0, 2 * y0
+            for (x1, y1), (x3, y3) in zip(row, row[1:]):
+                if x1 != x0:
+                    num, den = y0 - y1, x0 - x1
+                if (y3 * y3 - x3 * x3 * x3 - 7) % P:
+                    return False
+                if ((-y3 - y1) * den - num * (x3 - x1)) % P:
+                    return False
+                if x3 == x0 or x3 == x1:
+                    return False
+        return True
+
+
+# --- Montgomery ladder backend ----------------------------------------------
+
+def _fold(x):
+    """
+    Partially reduce x modulo p using 2^256 = 0x1000003D1 (mod p).
+
+    Two folds bring any product of partially reduced values below 2^257
+    in magnitude, which is small enough to feed the next multiplication.
+    The result may be negative and is only congruent to x; it is made
+    canonical with % P when the ladder finishes.
+    """
+    x = (x & _MASK256) + (x >> 256) * _P_FOLD
+    return (x & _MASK256) + (x >> 256) * _P_FOLD
+
+
+def _ladder_double(point):
+    """
+    Double a projective point with the complete a = 0 formula.
+
+    Renes-Costello-Batina 2016, algorithm 9: no exceptional cases, so the
+    point at infinity (0 : 1 : 0) needs no branch.
+    """
+    fold = _fold
+    x, y, z = point
+    t0 = fold(y * y)
+    z3 = 8 * t0
+    t1 = fold(y * z)
+    t2 = fold(_B3 * fold(z * z))
+    x3 = fold(t2 * z3)
+    y3 = t0 + t2
+    z3 = fold(t1 * z3)
+    t0 = t0 - 3 * t2
+    y3 = x3 + fold(t0 * y3)
+    x3 = 2 * fold(t0 * fold(x * y))
+    return (x3, y3, z3)
+
+
+def _ladder_add(p1, p2):
+    """
+    Add two projective points with the complete a = 0 formula.
+
+    Renes-Costello-Batina 2016, algorithm 7: correct for every pair of
+    inputs, including equal points and the point at infinity.
+    """
+    fold = _fold
+    x1, y1, z1 = p1
+    x2, y2, z2 = p2
+    t0 = fold(x1 * x2)
+    t1 = fold(y1 * y2)
+    t2 = fold(z1 * z2)
+    t3 = fold((x1 + y1) * (x2 + y2)) - t0 - t1
+    t4 = fold((y1 + z1) * (y2 + z2)) - t1 - t2
+    y3 = fold((x1 + z1) * (x2 + z2)) - t0 - t2
+    t0 = 3 * t0
+    t2 = _B3 * t2
+    z3 = t1 + t2
+    t1 = t1 - t2
+    y3 = _B3 * y3
+    x3 = fold(t3 * t1) - fold(t4 * y3)
+    y3 = fold(t1 * z3) + fold(y3 * t0)
+    z3 = fold(z3 * t4) + fold(t0 * t3)
+    return (x3, y3, z3)
+
+
+_LADDER_G2 = None
+
+
+def ladder_multiply(k):
+    """
+    Compute k * G in Jacobian coordinates with a Montgomery ladder.
+
+    The scalar is offset by n or 2n (the same point) so it always has
+    exactly 257 bits; the ladder then runs 256 identical steps, each one
+    conditional swap, one addition and one doubling. The swaps are done
+    with integer masks and the formulas are complete, so every scalar in
+    [1, n-1], including the edge values whose intermediate points reach
+    infinity, takes the same path with no branch or index on key bits.
+
+    Args:
+        k: Scalar in the range [1, n-1]
+
+    Returns:
+        Jacobian point (X, Y, Z) with canonical coordinates
+    """
+    global _LADDER_G2
+    if not 0 < k < N:
+        raise ValueError("Scalar out of secp256k1 range")
+    if _LADDER_G2 is None:
+        _LADDER_G2 = _ladder_double((GX, GY, 1))
+
+    k += N
+    k += N * (1 - (k >> 256))  # k + n or k + 2n, whichever has 257 bits
+
+    add = _ladder_add
+    double = _ladder_double
+    x0, y0, z0 = GX, GY, 1
+    x1, y1, z1 = _LADDER_G2
+    swap = 0
+    for i in range(255, -1, -1):
+        bit = (k >> i) & 1
+        # Swap the working points when the bit differs from the last one
+        mask = -(swap ^ bit)
+        t = (x0 ^ x1) & mask
+        x0 ^= t
+        x1 ^= t
+        t = (y0 ^ y1) & mask
+        y0 ^= t
+        y1 ^= t
+        t = (z0 ^ z1) & mask
+        z0 ^= t
+        z1 ^= t
+        swap = bit
+        r0 = (x0, y0, z0)
+        x1, y1, z1 = add(r0, (x1, y1, z1))
+        x0, y0, z0 = double(r0)
+    mask = -swap
+    x0 ^= (x0 ^ x1) & mask
+    y0 ^= (y0 ^ y1) & mask
+    z0 ^= (z0 ^ z1) & mask
+    # Projective (X : Y : Z) is Jacobian (XZ, YZ^2, Z)
+    z0 %= P
+    return (x0 * z0 % P, y0 * z0 * z0 % P, z0)
+
+
+_tables = {}
+
+
+def _cache_path(window):
+    """Return the cache file for a table of `window` bits, or None if caching is off."""
+    explicit = os.environ.get('ECMULT_TABLE_CACHE')
+    if explicit and window == DEFAULT_WINDOW:
+        return explicit
+    cache_dir = os.environ.get('ECMULT_CACHE_DIR', DEFAULT_CACHE_DIR)
+    if not cache_dir:
+        return None
+    return os.path.join(cache_dir, f"table-w{window}.bin")
+
+
+def get_table(window=DEFAULT_WINDOW):
+    """
+    Return the shared fixed-base table of `window` bits, building it on first use.
+
+    The table is loaded from its cache file when possible, or built and
+    written there if the file is missing or invalid.
+    """
+    table = _tables.get(window)
+    if table is None:
+        table = FixedBaseTable(window)
+        cache_path = _cache_path(window)
+        if not (cache_path and table.load(cache_path)):
+            table.build()
+            if cache_path:
+                try:
+                    os.makedirs(os.path.dirname(cache_path) or '.', mode=0o700, exist_ok=True)
+                    table.save(cache_path)
+                except OSError:
+                    pass
+        _tables[window] = table
+    return table
+
+
+def single_key_table():
+    """Return the batch table if it is already loaded, else the small single-key table."""
+    return _tables.get(DEFAULT_WINDOW) or get_table(SINGLE_KEY_WINDOW)
+
+
+_backend = os.environ.get('ECMULT_BACKEND', 'table')
+if _backend not in BACKENDS:
+    _backend = 'table'
+
+
+def set_backend(name):
+    """
+    Select the scalar multiplication backend for this process.
+
+    Args:
+        name: One of BACKENDS
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ecmult backend: {name}")
+    _backend = name
+
+
+def get_backend():
+    """Return the name of the selected backend."""
+    return _backend
+
+
+def multiply(k):
+    """
+    Compute k * G in Jacobian coordinates with the selected backend.
+
+    Args:
+        k: Scalar in the range [1, n-1]
+
+    Returns:
+        Jacobian point (X, Y, Z)
+    """
+    if _backend == 'ladder':
+        return ladder_multiply(k)
+    return single_key_table().multiply(k)
+
+
+def scalar_base_mult(k):
+    """
+    Compute the affine public key point k * G.
+
+    Args:
+        k: Scalar in the range [1, n-1]
+
+    Returns:
+        Affine point (x, y)
+    """
+    return to_affine(multiply(k))
+
+
+def compressed_pubkey(private_key_bytes):
+    """
+    Derive the 33-byte compressed public key for a 32-byte private key.
+
+    Args:
+        private_key_bytes: 32-byte big-endian private key
+
+    Returns:
+        33-byte compressed public key
+    """
+    x, y = scalar_base_mult(int.from_bytes(private_key_bytes, 'big'))
+    return encode_compressed(x, y)
+
+
+def normalize_batch(points):
+    """
+    Convert many Jacobian points to affine with one shared inversion.
+
+    Args:
+        points: Sequence of Jacobian points (X, Y, Z) with Z != 0
+
+    Returns:
+        List of affine points (x, y) in input order
+    """
+    z_invs = batch_inverse([z for _, _, z in points])
+    result = []
+    for (x, y, _), z_inv in zip(points, z_invs):
+        z_inv2 = z_inv * z_inv % P
+        result.append((x * z_inv2 % P, y * z_inv2 * z_inv % P))
+    return result
+
+
+def compressed_pubkeys(private_keys):
+    """
+    Derive compressed public keys for many 32-byte private keys.
+
+    Every point is multiplied in Jacobian coordinates and all of them are
+    normalized with a single field inversion.
+
+    Args:
+        private_keys: Sequence of 32-byte big-endian private keys
+
+    Returns:
+        List of 33-byte compressed public keys in input order
+    """
+    if _backend == 'ladder':
+        mult = ladder_multiply
+    else:
+        mult = get_table().multiply
+    points = [mult(int.from_bytes(key, 'big')) for key in private_keys]
+    return [encode_compressed(x, y) for x, y in normalize_batch(points)]
+
+
+def iter_range_pubkeys(start, count, stride=1, batch_size=1024):
+    """
+    Derive compressed public keys for start, start + stride, ... by point addition.
+
+    Only the first key pays for a scalar multiplication. Every following
+    point is the previous one plus stride * G (one mixed Jacobian addition),
+    and each batch of points is normalized with a single shared inversion.
+
+    Args:
+        start: First private key as an integer in [1, n-1]
+        count: Number of keys to derive
+        stride: Positive step between consecutive private keys
+        batch_size: Points normalized per shared inversion
+
+    Yields:
+        33-byte compressed public keys in key order
+    """
+    if count <= 0:
+        return
+    if stride <= 0:
+        raise ValueError("Stride must be positive")
+    if not 0 < start < N or start + (count - 1) * stride >= N:
+        raise ValueError("Key range exceeds secp256k1 range")
+
+    step_x, step_y = scalar_base_mult(stride)
+    point = multiply(start)
+    remaining = count
+    while remaining:
+        size = min(batch_size, remaining)
+        points = [point]
+        for _ in range(size - 1):
+            point = jacobian_add_affine(point, step_x, step_y)
+            points.append(point)
+        affine = normalize_batch(points)
+        for x, y in affine:
+            yield encode_compressed(x, y)
+
+        remaining -= size
+        if remaining:
+            x, y = affine[-1]
+            point = jacobian_add_affine((x, y, 1), step_x, step_y)
+
+
+# --- Differential self-check ------------------------------------------------
+
+def _reference_multiply(k):
+    """Compute k * G with textbook affine double-and-add (slow, for checking only)."""
+    result = None
+    addend = (GX, GY)
+    while k:
+        if k & 1:
+            result = _affine_add(result, addend)
+        addend = _affine_add(addend, addend)
+        k >>= 1
+    return result
+
+
+def _affine_add(p1, p2):
+    if p1 is None:
+        return p2
+    x1, y1 = p1
+    x2, y2 = p2
+    if x1 == x2:
+        if (y1 + y2) % P == 0:
+            return None
+        slope = 3 * x1 * x1 * pow(2 * y1, -1, P) % P
+    else:
+        slope = (y2 - y1) * pow(x2 - x1, -1, P) % P
+    x3 = (slope * slope - x1 - x2) % P
+    return (x3, (slope * (x1 - x3) - y1) % P)
+
+
+def self_check(count=200, seed=None):
+    """
+    Compare every backend against independent implementations.
+
+    Checks edge scalars and `count` random ones. Each backend's affine
+    result is compared with the affine double-and-add reference and, when
+    the ecdsa package is installed, with ecdsa's secp256k1 public key.
+
+    Args:
+        count: Number of random scalars
+        seed: Seed for the random scalars, or None for a fresh sequence
+
+    Returns:
+        Tuple of (list of (backend, k) mismatches, True if ecdsa was used)
+    """
+    import random
+
+    try:
+        import ecdsa
+    except ImportError:
+        ecdsa = None
+
+    rng = random.Random(seed)
+    scalars = [1, 2, 3, 7, N - 3, N - 2, N - 1, 1 << 128, (1 << 255) - 1, 1 << 255,
+               N - (1 << 128), (1 << 256) - N]
+    scalars += [rng.randrange(1, N) for _ in range(count)]
+
+    mismatches = []
+    for k in scalars:
+        expected = _reference_multiply(k)
+        if ecdsa is not None:
+            key = ecdsa.SigningKey.from_string(k.to_bytes(32, 'big'), curve=ecdsa.SECP256k1)
+            point = key.get_verifying_key().pubkey.point
+            if (point.x(), point.y()) != expected:
+                mismatches.append(('ecdsa-reference', k))
+        for name in BACKENDS:
+            point = ladder_multiply(k) if name == 'ladder' else get_table().multiply(k)
+            if to_affine(point) != expected:
+                mismatches.append((name, k))
+    return mismatches, ecdsa is not None
+
+
+def main():
+    """Command line entry point: run the differential self-check."""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="secp256k1 backend self-check")
+    parser.add_argument('--self-check', type=int, nargs='?', const=200, default=200,
+                        metavar='COUNT', help="random scalars to check (default: 200)")
+    parser.add_argument('--seed', type=int, default=None, help="seed for the random scalars")
+    args = parser.parse_args()
+
+    mismatches, used_ecdsa = self_check(args.self_check, args.seed)
+    against = "ecdsa and the affine reference" if used_ecdsa else "the affine reference"
+    if mismatches:
+        for name, k in mismatches:
+            print(f"❌ {name}: mismatch for k = {k:064x}")
+        sys.exit(1)
+    print(f"✅ Backends {', '.join(BACKENDS)} agree with {against} "
+          f"on {args.self_check} random and edge scalars")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Fleet Grading - Many Submissions in Parallel
+============================================
+
+Grades every submission checkout under a directory with a pool of
+workers and streams one report record per submission as soon as it is
+graded.
+
+A submission is any immediate subdirectory that contains a solution/
+folder. For each one:
+
+    detect      find the implemented solution (as secure_test_runner.py
+                does; --language forces one)
+    banned      check it against the runner's banned-library patterns
+    build/test  run secure_test_runner.py inside the checkout, in its own
+                process group, killed after --timeout seconds
+
+The test keys and their reference outputs for ASSIGNMENT_SEED are
+computed once, in memory, before grading starts. Each runner receives
+them as JSON on its stdin (TEST_CASES_FROM_STDIN=1) and reads them before
+any submission code runs; nothing is written to disk. Runners get an
+environment without the seed or any cache settings, and the runner in
+turn strips its grader settings from every student process.
+
+Each run gets a private temporary directory outside all checkouts
+(deleted afterwards) holding the submission's build directory and a
+read-only copy of the grader modules it runs. Editing the grader from
+submission code therefore only affects that submission's own run, and
+compiled artifacts are never shared between submissions.
+
+This is not a sandbox: submission code runs as the grading user and can
+read or write anything that user can, including sibling checkouts. Run
+the fleet grader as a dedicated user, or in a container per submission,
+when submissions must be kept from each other.
+
+Report records (JSONL, or CSV when the report path ends in .csv) hold
+the submission name, language, status, passed/total tests, wall time and
+a short detail message. Status is one of: passed, failed, build_failed,
+timeout, banned, no_solution, template_only, multiple_solutions, error.
+
+Usage:
+    ASSIGNMENT_SEED=hw1 python3 fleet_grader.py submissions/ --report grades.jsonl
+    python3 fleet_grader.py submissions/ --workers 8 --timeout 300 --report grades.csv
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import time
+import shutil
+import signal
+import tempfile
+import argparse
+import threading
+import subprocess
+import concurrent.futures
+from pathlib import Path
+
+import reference_engine
+from secure_test_runner import (SecureValidator, SOLUTION_FILES, BUILD_TIMEOUT, TEST_TIMEOUT,
+                                CASES_FROM_STDIN, check_banned_libraries, find_solutions,
+                                student_env)
+
+GRADER_DIR = Path(__file__).resolve().parent
+RUNNER = 'secure_test_runner.py'
+
+# Modules the runner imports, copied for every run (see copy_grader)
+GRADER_MODULES = ('secure_test_runner.py', 'secure_tests.py', 'reference_engine.py',
+                  'banned_scanner.py', 'cache_paths.py', 'hashing.py')
+
+DEFAULT_TEST_COUNT = 3
+
+REPORT_FIELDS = ('submission', 'language', 'status', 'passed', 'total', 'seconds', 'detail')
+
+_RESULTS_LINE = re.compile(r'RESULTS: (\d+)/(\d+) tests passed')
+
+# Lines of runner output kept in the detail of an unexpected failure
+DETAIL_LINES = 5
+
+
+def find_submissions(root):
+    """Return the checkout directories under `root` that contain a solution/ folder, sorted."""
+    return sorted(path for path in Path(root).iterdir()
+                  if path.is_dir() and (path / 'solution').is_dir())
+
+
+def detect_solution(submission, language=None):
+    """
+    Pick the solution to grade in a checkout.
+
+    Returns:
+        Tuple of (language, solution file path or None, status if no
+        solution can be graded else None)
+    """
+    solution_dir = submission / 'solution'
+    if language:
+        file_path = solution_dir / language / SOLUTION_FILES[language]
+        if not file_path.exists():
+            return language, None, 'no_solution'
+        return language, file_path, None
+
+    implemented, template_only = find_solutions(solution_dir)
+    if len(implemented) == 1:
+        language, file_path = implemented[0]
+        return language, Path(file_path), None
+    if implemented:
+        return ','.join(lang for lang, _ in implemented), None, 'multiple_solutions'
+    return None, None, 'template_only' if template_only else 'no_solution'
+
+
+def run_isolated(command, cwd, env, timeout, input=None):
+    """
+    Run a command in its own session, killing its whole process group on timeout.
+
+    Args:
+        input: Text written to the command's stdin, or None for no stdin
+
+    Returns:
+        Tuple of (exit code or None on timeout, combined output text)
+    """
+    process = subprocess.Popen(command, cwd=cwd, env=env, text=True, errors='replace',
+                               stdin=subprocess.DEVNULL if input is None else subprocess.PIPE,
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT,
+                               start_new_session=True)
+    try:
+        output, _ = process.communicate(input, timeout=timeout)
+        return process.returncode, output
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        output, _ = process.communicate()
+        return None, output
+
+
+def copy_grader(target):
+    """Copy GRADER_MODULES into a new directory `target` and make it read-only."""
+    target.mkdir()
+    for name in GRADER_MODULES:
+        shutil.copyfile(GRADER_DIR / name, target / name)
+        (target / name).chmod(0o444)
+    target.chmod(0o555)
+
+
+def remove_run_dir(run_dir):
+    """Delete a run directory, including read-only parts."""
+    for path in (run_dir, *Path(run_dir).rglob('*')):
+        if path.is_dir() and not path.is_symlink():
+            try:
+                path.chmod(0o700)
+            except OSError:
+                pass
+    shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def summarize_output(output):
+    """Return the last few non-empty lines of runner output as one line."""
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    return ' | '.join(lines[-DETAIL_LINES:])
+
+
+def grade_submission(submission, env, cases, timeout, language=None):
+    """
+    Grade one checkout.
+
+    Args:
+        submission: Checkout directory
+        env: Environment for the runner process (no seed, no cache paths)
+        cases: Test cases JSON written to the runner's stdin
+        timeout: Seconds before the runner and its children are killed
+        language: Force this language instead of detecting it
+
+    Returns:
+        Report record dict (see REPORT_FIELDS)
+    """
+    started = time.perf_counter()
+    record = {'submission': submission.name, 'language': None, 'status': 'error',
+              'passed': 0, 'total': 0, 'seconds': 0.0, 'detail': ''}
+
+    def done(status, detail=''):
+        record['status'] = status
+        record['detail'] = detail
+        record['seconds'] = round(time.perf_counter() - started, 3)
+        return record
+
+    try:
+        record['language'], solution_file, status = detect_solution(submission, language)
+        if status:
+            return done(status)
+
+        banned, error = check_banned_libraries(solution_file, record['language'])
+        if error:
+            return done('error', f"cannot read {solution_file.name}: {error}")
+        if banned:
+            return done('banned', f"banned library pattern: {banned}")
+
+        run_dir = Path(tempfile.mkdtemp(prefix='fleet-run-'))
+        try:
+            copy_grader(run_dir / 'grader')
+            runner_env = dict(env, LANGUAGE=record['language'],
+                              BUILD_CACHE_DIR=str(run_dir / 'build'))
+            code, output = run_isolated([sys.executable, str(run_dir / 'grader' / RUNNER)],
+                                        submission, runner_env, timeout, input=cases)
+        finally:
+            remove_run_dir(run_dir)
+    except Exception as e:
+        return done('error', str(e))
+
+    results = _RESULTS_LINE.search(output)
+    if results:
+        record['passed'], record['total'] = int(results.group(1)), int(results.group(2))
+    if code is None:
+        return done('timeout', f"killed after {timeout} s")
+    if 'Compilation failed' in output:
+        return done('build_failed', summarize_output(output))
+    if not results:
+        return done('error', summarize_output(output))
+    if code == 0 and record['passed'] == record['total']:
+        return done('passed')
+    return done('failed')
+
+
+class ReportWriter:
+    """Thread-safe streaming report in JSONL or CSV."""
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        self._lock = threading.Lock()
+        self._csv = None
+        if fmt == 'csv':
+            self._csv = csv.DictWriter(stream, fieldnames=REPORT_FIELDS)
+            self._csv.writeheader()
+            stream.flush()
+
+    def write(self, record):
+        """Append one record and flush it."""
+        with self._lock:
+            if self._csv:
+                self._csv.writerow(record)
+            else:
+                self.stream.write(json.dumps(record) + '\n')
+            self.stream.flush()
+
+
+def prepare_shared_state(test_count):
+    """
+    Compute the test cases once and build the runner environment.
+
+    Returns:
+        Tuple of (environment dict for the runner processes, test cases
+        JSON for their stdin)
+    """
+    env = student_env()
+    env['TEST_COUNT'] = str(test_count)
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    env[CASES_FROM_STDIN] = '1'
+
+    validator = SecureValidator()
+    test_keys = validator.generate_test_keys(test_count)
+    expected = reference_engine.expected_outputs(validator.seed, test_keys)
+    return env, json.dumps({'keys': test_keys, 'expected': expected})
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Grade many submission checkouts in parallel")
+    parser.add_argument('submissions', help="directory holding one checkout per submission")
+    parser.add_argument('--report', metavar='PATH',
+                        help="report file (.csv for CSV, JSONL otherwise; default: stdout)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="submissions graded at once (0: one per CPU)")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="seconds per submission, build included (default: build "
+                             "timeout plus the per-key deadline for every test)")
+    parser.add_argument('--language', choices=sorted(SOLUTION_FILES),
+                        help="grade this language in every checkout instead of detecting")
+    parser.add_argument('--test-count', type=int,
+                        default=int(os.environ.get('TEST_COUNT', DEFAULT_TEST_COUNT)),
+                        help="test keys per submission")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Grade every submission and stream the report."""
+    args = parse_args()
+    submissions = find_submissions(args.submissions) if Path(args.submissions).is_dir() else []
+    if not submissions:
+        print(f"❌ No submissions with a solution/ folder found in {args.submissions}",
+              file=sys.stderr)
+        sys.exit(1)
+
+    test_count = max(1, args.test_count)
+    workers = args.workers or os.cpu_count() or 1
+    timeout = args.timeout or BUILD_TIMEOUT + TEST_TIMEOUT * test_count
+    print(f"🎓 Fleet grading {len(submissions)} submissions "
+          f"({workers} workers, {test_count} tests each)", file=sys.stderr)
+
+    env, cases = prepare_shared_state(test_count)
+    print("✓ Reference outputs ready", file=sys.stderr)
+
+    report_file = open(args.report, 'w', encoding='utf-8', newline='') if args.report else sys.stdout
+    fmt = 'csv' if args.report and args.report.endswith('.csv') else 'jsonl'
+    writer = ReportWriter(report_file, fmt)
+    statuses = {}
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(grade_submission, submission, env, cases, timeout,
+                                   args.language)
+                       for submission in submissions]
+            for future in concurrent.futures.as_completed(futures):
+                record = future.result()
+                writer.write(record)
+                statuses[record['status']] = statuses.get(record['status'], 0) + 1
+                icon = '✅' if record['status'] == 'passed' else '❌'
+                print(f"{icon} {record['submission']}: {record['status']} "
+                      f"{record['passed']}/{record['total']} ({record['seconds']:.1f}s)",
+                      file=sys.stderr)
+    finally:
+        if args.report:
+            report_file.close()
+
+    summary = ', '.join(f"{status} {count}" for status, count in sorted(statuses.items()))
+    print(f"\n📊 {len(submissions)} submissions graded: {summary}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Hashing Layer for Key Derivation
+================================
+
+Hash160 (RIPEMD-160 of SHA-256) and double-SHA256 checksums for
+addresses and WIF strings.
+
+Hash constructors are resolved once at import time. RIPEMD-160 objects
+are cloned from a prototype instead of being looked up by name with
+hashlib.new on every call. OpenSSL 3 builds may not provide RIPEMD-160
+at all (it lives in the legacy provider); in that case a pure-Python
+implementation is selected automatically. Set RIPEMD160_BACKEND=python
+to force the fallback.
+
+Batch functions operate on contiguous buffers of fixed-width items and
+return the digests concatenated in one bytes object.
+
+Used by derive_cli.py and the result store. The validator hashes with
+hashlib directly (see reference_engine.py) and borrows only the
+pure-Python RIPEMD-160 when OpenSSL lacks it.
+"""
+
+import os
+import struct
+import hashlib
+
+sha256 = hashlib.sha256
+
+
+# --- Pure-Python RIPEMD-160 -------------------------------------------------
+
+_MASK = 0xFFFFFFFF
+
+_R_LEFT = (
+    0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+    7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+    3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
+    1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+    4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13,
+)
+_R_RIGHT = (
+    5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
+    6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+    15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
+    8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+    12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11,
+)
+_S_LEFT = (
+    11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
+    7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+    11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
+    11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+    9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6,
+)
+_S_RIGHT = (
+    8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
+    9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+    9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
+    15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+    8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11,
+)
+_K_LEFT = (0x00000000, 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xA953FD4E)
+_K_RIGHT = (0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x7A6D76E9, 0x00000000)
+
+
+def _f(j, x, y, z):
+    if j < 16:
+        return x ^ y ^ z
+    if j < 32:
+        return (x & y) | (~x & z)
+    if j < 48:
+        return (x | ~y) ^ z
+    if j < 64:
+        return (x & z) | (y & ~z)
+    return x ^ (y | ~z)
+
+
+def _rotl(x, n):
+    return ((x << n) | (x >> (32 - n))) & _MASK
+
+
+def _compress(state, block):
+    words = struct.unpack('<16I', block)
+    al = ar = state[0]
+    bl = br = state[1]
+    cl = cr = state[2]
+    dl = dr = state[3]
+    el = er = state[4]
+    for j in range(80):
+        rnd = j >> 4
+        t = _rotl((al + _f(j, bl, cl, dl) + words[_R_LEFT[j]] + _K_LEFT[rnd]) & _MASK,
+                  _S_LEFT[j]) + el
+        al, el, dl, cl, bl = el, dl, _rotl(cl, 10), bl, t & _MASK
+        t = _rotl((ar + _f(79 - j, br, cr, dr) + words[_R_RIGHT[j]] + _K_RIGHT[rnd]) & _MASK,
+                  _S_RIGHT[j]) + er
+        ar, er, dr, cr, br = er, dr, _rotl(cr, 10), br, t & _MASK
+    t = (state[1] + cl + dr) & _MASK
+    state[1] = (state[2] + dl + er) & _MASK
+    state[2] = (state[3] + el + ar) & _MASK
+    state[3] = (state[4] + al + br) & _MASK
+    state[4] = (state[0] + bl + cr) & _MASK
+    state[0] = t
+
+
+def ripemd160_python(data):
+    """
+    Compute RIPEMD-160 in pure Python.
+
+    Args:
+        data: Bytes-like message
+
+    Returns:
+        20-byte digest
+    """
+    data = bytes(data)
+    state = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0]
+    padded = data + b'\x80' + b'\x00' * ((55 - len(data)) % 64) + struct.pack('<Q', len(data) * 8)
+    for offset in range(0, len(padded), 64):
+        _compress(state, padded[offset:offset + 64])
+    return struct.pack('<5I', *state)
+
+
+# --- Constructor resolution -------------------------------------------------
+
+def _resolve_ripemd160():
+    """Pick the RIPEMD-160 implementation once: OpenSSL if usable, else pure Python."""
+    if os.environ.get('RIPEMD160_BACKEND', '').lower() != 'python':
+        try:
+            prototype = hashlib.new('ripemd160')
+        except ValueError:
+            pass
+        else:
+            def ripemd160_openssl(data):
+                h = prototype.copy()
+                h.update(data)
+                return h.digest()
+            return ripemd160_openssl, 'openssl'
+    return ripemd160_python, 'python'
+
+
+ripemd160, RIPEMD160_BACKEND = _resolve_ripemd160()
+
+
+def hash160(data):
+    """Return RIPEMD160(SHA256(data)), the 20-byte Hash160."""
+    return ripemd160(sha256(data).digest())
+
+
+def double_sha256(data):
+    """Return SHA256(SHA256(data))."""
+    return sha256(sha256(data).digest()).digest()
+
+
+def checksum(payload):
+    """Return the 4-byte Base58Check checksum of `payload`."""
+    return sha256(sha256(payload).digest()).digest()[:4]
+
+
+def _items(buffer, width):
+    view = memoryview(buffer)
+    if len(view) % width:
+        raise ValueError(f"Buffer length {len(view)} is not a multiple of {width}")
+    return [view[offset:offset + width] for offset in range(0, len(view), width)]
+
+
+def hash160_many(buffer, width=33):
+    """
+    Hash160 every fixed-width item of a contiguous buffer.
+
+    Args:
+        buffer: Bytes-like object holding items back to back
+        width: Item width in bytes (33 for compressed public keys)
+
+    Returns:
+        Concatenated 20-byte digests, in item order
+    """
+    ripemd = ripemd160
+    sha = sha256
+    return b''.join([ripemd(sha(item).digest()) for item in _items(buffer, width)])
+
+
+def checksum_many(buffer, width):
+    """
+    Compute the Base58Check checksum of every fixed-width payload in a buffer.
+
+    Args:
+        buffer: Bytes-like object holding payloads back to back
+        width: Payload width in bytes (21 for P2PKH, 34 for compressed WIF)
+
+    Returns:
+        Concatenated 4-byte checksums, in payload order
+    """
+    sha = sha256
+    return b''.join([sha(sha(item).digest()).digest()[:4] for item in _items(buffer, width)])
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Opt-in Instrumentation for Key Derivation
+=========================================
+
+Per-stage call counters and timing histograms for the derivation hot
+path, plus a profiling mode for bulk runs.
+
+Nothing is instrumented until enable() is called: it replaces the stage
+functions on their modules with timing wrappers, so a run without
+metrics executes exactly the original functions with no extra checks.
+
+Configuration (derive_cli.py also takes --metrics/--profile):
+
+    DERIVE_METRICS=json|prometheus   enable metrics in this format
+    DERIVE_METRICS_FILE=PATH         write metrics to PATH (default: stderr)
+    DERIVE_PROFILE=PATH              run bulk modes under cProfile and
+                                     tracemalloc and write a report to PATH
+
+Metrics are written when the process exits and whenever it receives
+SIGUSR1. They cover the process that collected them: with --workers N
+the work done inside pool workers is not included.
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import atexit
+import bisect
+import signal
+import pstats
+import cProfile
+import functools
+import tracemalloc
+
+FORMATS = ('json', 'prometheus')
+
+# Histogram upper bounds in seconds: 1 µs to 10 s, 1-2.5-5 steps per decade
+BUCKETS = (1e-06, 2.5e-06, 5e-06, 1e-05, 2.5e-05, 5e-05,
+           0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+           0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0)
+
+PROFILE_TOP = 30
+
+
+class StageMetrics:
+    """Call and item counters and a timing histogram for one stage."""
+
+    def __init__(self):
+        self.calls = 0
+        self.items = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+
+    def observe(self, seconds, items=1):
+        """Record one call that handled `items` keys in `seconds`."""
+        self.calls += 1
+        self.items += items
+        self.seconds += seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def to_dict(self):
+        """Return the metrics with cumulative bucket counts keyed by upper bound."""
+        cumulative = []
+        total = 0
+        for count in self.buckets:
+            total += count
+            cumulative.append(total)
+        return {
+            'calls': self.calls,
+            'items': self.items,
+            'seconds': self.seconds,
+            'buckets': {**{repr(bound): n for bound, n in zip(BUCKETS, cumulative)},
+                        '+Inf': cumulative[-1]},
+        }
+
+
+stages = {}
+
+
+def timed(stage, func, batched=False):
+    """
+    Wrap `func` so every call is recorded under `stage`.
+
+    Args:
+        stage: Stage name
+        func: Function to wrap
+        batched: Count len(first argument) items per call instead of one
+    """
+    metrics = stages.setdefault(stage, StageMetrics())
+    clock = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        result = func(*args, **kwargs)
+        metrics.observe(clock() - start, len(args[0]) if batched else 1)
+        return result
+
+    return wrapper
+
+
+def render(fmt):
+    """Render the collected metrics as JSON or Prometheus text."""
+    if fmt == 'json':
+        return json.dumps({'pid': os.getpid(),
+                           'stages': {name: m.to_dict() for name, m in sorted(stages.items())}},
+                          indent=2) + '\n'
+    if fmt != 'prometheus':
+        raise ValueError(f"Unknown metrics format: {fmt}")
+
+    lines = [
+        '# HELP derive_stage_calls_total Calls per derivation stage.',
+        '# TYPE derive_stage_calls_total counter',
+    ]
+    for name, m in sorted(stages.items()):
+        lines.append(f'derive_stage_calls_total{{stage="{name}"}} {m.calls}')
+    lines += [
+        '# HELP derive_stage_items_total Keys handled per derivation stage.',
+        '# TYPE derive_stage_items_total counter',
+    ]
+    for name, m in sorted(stages.items()):
+        lines.append(f'derive_stage_items_total{{stage="{name}"}} {m.items}')
+    lines += [
+        '# HELP derive_stage_seconds Time per derivation stage call.',
+        '# TYPE derive_stage_seconds histogram',
+    ]
+    for name, m in sorted(stages.items()):
+        for bound, count in m.to_dict()['buckets'].items():
+            lines.append(f'derive_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+        lines.append(f'derive_stage_seconds_sum{{stage="{name}"}} {m.seconds:.9f}')
+        lines.append(f'derive_stage_seconds_count{{stage="{name}"}} {m.calls}')
+    return '\n'.join(lines) + '\n'
+
+
+def dump(fmt, path=None):
+    """Write the metrics to `path` (replaced atomically) or to stderr."""
+    text = render(fmt)
+    if not path:
+        sys.stderr.write(text)
+        sys.stderr.flush()
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def enable(targets, fmt, path=None):
+    """
+    Instrument stage functions and arrange for metrics to be dumped.
+
+    Args:
+        targets: Iterable of (module or class, attribute name, batched)
+        fmt: One of FORMATS
+        path: Metrics file, or None for stderr
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown metrics format: {fmt}")
+    for owner, name, batched in targets:
+        func = getattr(owner, name)
+        prefix = getattr(owner, '__name__', '').strip('_')
+        stage = f"{prefix}.{name}" if prefix else name
+        setattr(owner, name, timed(stage, func, batched))
+
+    atexit.register(dump, fmt, path)
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: dump(fmt, path))
+
+
+def env_format():
+    """Return the metrics format requested by DERIVE_METRICS, or None."""
+    fmt = os.environ.get('DERIVE_METRICS', '').lower()
+    return fmt if fmt in FORMATS else None
+
+
+def profile_call(report_path, func, *args, **kwargs):
+    """
+    Call `func` under cProfile and tracemalloc and write a text report.
+
+    The report lists the top functions by cumulative time and the source
+    lines holding the most memory allocated during the call, with the
+    peak traced memory.
+
+    Returns:
+        Whatever `func` returns
+    """
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - started
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        out = io.StringIO()
+        out.write(f"Wall time: {elapsed:.3f} s (under profiling)\n")
+        out.write(f"Peak traced memory: {peak / 1024:.1f} KiB\n\n")
+        out.write(f"== Top {PROFILE_TOP} functions by cumulative time ==\n")
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        out.write(f"== Top {PROFILE_TOP} allocation sites ==\n")
+        for stat in snapshot.statistics('lineno')[:PROFILE_TOP]:
+            out.write(f"{stat}\n")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(out.getvalue())
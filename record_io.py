@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Bulk Derivation Record Formats and Key Files
+============================================
+
+Output formats for bulk derivation, all rendered to bytes:
+
+    text    <pubkey hex>\t<wif>\t<address>            (one line per key)
+    csv     index,pubkey,wif,address                  (with header row)
+    jsonl   {"index": ..., "pubkey": ..., "wif": ..., "address": ...}
+    binary  fixed 61-byte records: 8-byte big-endian key index,
+            33-byte compressed public key, 20-byte Hash160
+
+The index is the 0-based position of the key in its input: the line
+index for text input, the record index for key files, or the offset
+from the start key in range mode.
+
+Binary key files are raw 32-byte big-endian private keys back to back.
+They are memory-mapped and handed out as memoryview slices, so keys are
+never copied one by one.
+"""
+
+import os
+import json
+import mmap
+import struct
+
+from result_store import KEY_WIDTH, PUBKEY_WIDTH, HASH160_WIDTH
+
+FORMATS = ('text', 'csv', 'jsonl', 'binary')
+
+BINARY_RECORD = struct.Struct('>Q33s20s')
+
+_INDEX = struct.Struct('>Q')
+
+
+def header(fmt):
+    """Return the bytes written once before the first record of `fmt`."""
+    if fmt == 'csv':
+        return b'index,pubkey,wif,address\n'
+    return b''
+
+
+def render(store, indices, fmt):
+    """
+    Render the rows of a result store.
+
+    Args:
+        store: ResultsView holding the derived keys
+        indices: Input index of each row, in row order
+        fmt: One of FORMATS
+
+    Returns:
+        Rendered records as bytes
+    """
+    if fmt == 'text':
+        return ''.join(store.records()).encode('ascii')
+
+    if fmt == 'binary':
+        _, pubkeys, hash160s, _ = store.columns()
+        out = bytearray()
+        for row, index in enumerate(indices):
+            out += _INDEX.pack(index)
+            out += pubkeys[row * PUBKEY_WIDTH:(row + 1) * PUBKEY_WIDTH]
+            out += hash160s[row * HASH160_WIDTH:(row + 1) * HASH160_WIDTH]
+        return bytes(out)
+
+    lines = []
+    for row, (index, wif, address) in enumerate(zip(indices, store.wifs(), store.addresses())):
+        pubkey = store.pubkey(row).hex().upper()
+        if fmt == 'csv':
+            lines.append(f"{index},{pubkey},{wif},{address}\n")
+        elif fmt == 'jsonl':
+            lines.append(json.dumps({'index': index, 'pubkey': pubkey,
+                                     'wif': wif, 'address': address}) + '\n')
+        else:
+            raise ValueError(f"Unknown output format: {fmt}")
+    return ''.join(lines).encode('ascii')
+
+
+def iter_binary_records(data):
+    """
+    Decode binary-format output.
+
+    Args:
+        data: Bytes-like object holding whole 61-byte records
+
+    Yields:
+        Tuples of (index, 33-byte pubkey, 20-byte Hash160)
+    """
+    if len(data) % BINARY_RECORD.size:
+        raise ValueError("Binary output is not a whole number of records")
+    yield from BINARY_RECORD.iter_unpack(data)
+
+
+def key_file_count(path):
+    """
+    Return the number of keys in a binary key file.
+
+    Raises:
+        ValueError: If the file size is not a multiple of 32 bytes
+    """
+    size = os.path.getsize(path)
+    if size % KEY_WIDTH:
+        raise ValueError(f"Key file size {size} is not a multiple of {KEY_WIDTH} bytes")
+    return size // KEY_WIDTH
+
+
+def iter_key_file(path, chunk_keys):
+    """
+    Memory-map a binary key file and hand it out in chunks.
+
+    Each yielded chunk is a memoryview into the mapping and is released
+    when the generator advances. Callers must not keep slices of a chunk
+    beyond that, since the mapping is closed when the generator finishes.
+
+    Args:
+        path: Path to a file of raw 32-byte keys
+        chunk_keys: Maximum number of keys per chunk
+
+    Yields:
+        Tuples of (index of the first key, memoryview of chunk bytes)
+    """
+    count = key_file_count(path)
+    if not count:
+        return
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            for first in range(0, count, chunk_keys):
+                last = min(first + chunk_keys, count)
+                chunk = view[first * KEY_WIDTH:last * KEY_WIDTH]
+                try:
+                    yield first, chunk
+                finally:
+                    chunk.release()
+        finally:
+            view.release()
+
+
+def split_keys(buffer):
+    """Slice a contiguous key buffer into 32-byte memoryviews without copying."""
+    view = memoryview(buffer)
+    return [view[offset:offset + KEY_WIDTH] for offset in range(0, len(view), KEY_WIDTH)]
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Reference Output Engine
+=======================
+
+Computes the expected outputs (compressed public key, WIF, address) for
+a whole set of test keys at once, for SecureValidator.
+
+The reference path is independent of the code the Python solution
+imports: public keys come from the ecdsa package, Base58Check from the
+base58 package and hashes straight from hashlib, so a bug in ecmult.py,
+base58check.py or hashing.py cannot make the solution agree with itself.
+(Only when OpenSSL lacks RIPEMD-160 is the pure-Python fallback in
+hashing.py used.) Large key sets are split across a process pool.
+
+Expected outputs are the answer key, so by default they only ever live
+in the grader's memory. A grader that runs the same seed repeatedly can
+opt in to an on-disk memo by setting REFERENCE_CACHE_DIR (or passing a
+ReferenceCache): entries are keyed by a SHA-256 hash of ASSIGNMENT_SEED,
+the directory must lie outside the working directory (the graded
+checkout), and it is created readable by the grader's user only. The
+memo is kept under REFERENCE_CACHE_MAX_BYTES (default: 64 MiB) by
+evicting the least recently used files.
+"""
+
+import os
+import json
+import hashlib
+import concurrent.futures
+
+import ecdsa
+import base58
+
+import hashing
+import cache_paths
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Key sets at least this large are split across worker processes
+PARALLEL_THRESHOLD = 4096
+CHUNK_KEYS = 1024
+
+
+def _ripemd160(data):
+    try:
+        return hashlib.new('ripemd160', data).digest()
+    except ValueError:
+        return hashing.ripemd160_python(data)
+
+
+def _b58check(payload):
+    checksum = hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+    return base58.b58encode(payload + checksum).decode('ascii')
+
+
+def derive_reference(private_key_bytes):
+    """
+    Compute the expected outputs for one private key.
+
+    Args:
+        private_key_bytes: 32-byte private key
+
+    Returns:
+        Tuple of (compressed pubkey hex, WIF, address)
+    """
+    signing_key = ecdsa.SigningKey.from_string(private_key_bytes, curve=ecdsa.SECP256k1)
+    point = signing_key.get_verifying_key().pubkey.point
+    prefix = b'\x03' if point.y() & 1 else b'\x02'
+    compressed_pubkey = prefix + point.x().to_bytes(32, 'big')
+
+    wif = _b58check(b'\x80' + private_key_bytes + b'\x01')
+    hash160 = _ripemd160(hashlib.sha256(compressed_pubkey).digest())
+    address = _b58check(b'\x00' + hash160)
+    return compressed_pubkey.hex().upper(), wif, address
+
+
+def derive_reference_chunk(private_keys_hex):
+    """
+    Compute expected outputs for a chunk of hex private keys.
+
+    Args:
+        private_keys_hex: List of 64-character hex private keys
+
+    Returns:
+        List of (pubkey hex, WIF, address) tuples in input order
+    """
+    return [derive_reference(bytes.fromhex(key)) for key in private_keys_hex]
+
+
+def compute_reference_outputs(private_keys_hex, workers=None):
+    """
+    Compute expected outputs for every key, in parallel for large sets.
+
+    Args:
+        private_keys_hex: List of 64-character hex private keys
+        workers: Worker processes for large sets (default: CPU count)
+
+    Returns:
+        List of (pubkey hex, WIF, address) tuples in input order
+    """
+    workers = workers or os.cpu_count() or 1
+    if len(private_keys_hex) < PARALLEL_THRESHOLD or workers == 1:
+        return derive_reference_chunk(private_keys_hex)
+
+    chunks = [private_keys_hex[i:i + CHUNK_KEYS]
+              for i in range(0, len(private_keys_hex), CHUNK_KEYS)]
+    outputs = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_outputs in pool.map(derive_reference_chunk, chunks):
+            outputs.extend(chunk_outputs)
+    return outputs
+
+
+class ReferenceCache:
+    """Grader-only on-disk memo of reference outputs per seed, with LRU size bound."""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        Args:
+            cache_dir: Memo directory (default: REFERENCE_CACHE_DIR)
+            max_bytes: Size bound (default: REFERENCE_CACHE_MAX_BYTES)
+
+        Raises:
+            ValueError: If no directory is configured or it lies inside
+                the working directory
+        """
+        cache_dir = cache_dir or os.environ.get('REFERENCE_CACHE_DIR')
+        if not cache_dir:
+            raise ValueError("No reference cache directory configured")
+        self.cache_dir = cache_paths.outside_tree(cache_dir)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get('REFERENCE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+
+    def path_for(self, seed):
+        """Return the cache file for `seed`; the seed itself is never stored."""
+        seed_hash = hashlib.sha256(seed.encode()).hexdigest()
+        return self.cache_dir / f"{seed_hash}.json"
+
+    def get(self, seed, private_keys_hex):
+        """
+        Look up cached outputs for the given keys.
+
+        Returns:
+            List of (pubkey hex, WIF, address) tuples, or None on a miss
+        """
+        path = self.path_for(seed)
+        if not cache_paths.is_trusted(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        count = len(private_keys_hex)
+        if entry.get('keys', [])[:count] != list(private_keys_hex):
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return [tuple(output) for output in entry['outputs'][:count]]
+
+    def put(self, seed, private_keys_hex, outputs):
+        """Store outputs for `seed` and evict old entries beyond the size bound."""
+        cache_paths.make_private_dir(self.cache_dir)
+        path = self.path_for(seed)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, 'w', encoding='utf-8') as f:
+            json.dump({'keys': list(private_keys_hex), 'outputs': outputs}, f)
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = []
+        for path in self.cache_dir.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+
+def expected_outputs(seed, private_keys_hex, cache=None):
+    """
+    Return expected outputs for the test keys of `seed`.
+
+    Args:
+        seed: ASSIGNMENT_SEED the keys were derived from
+        private_keys_hex: List of 64-character hex private keys
+        cache: ReferenceCache to use; None uses one only when
+            REFERENCE_CACHE_DIR is set, otherwise nothing touches disk
+
+    Returns:
+        Dict mapping each hex key to {'pubkey', 'wif', 'address'}
+
+    Raises:
+        ValueError: If REFERENCE_CACHE_DIR lies inside the working directory
+    """
+    if cache is None and os.environ.get('REFERENCE_CACHE_DIR'):
+        cache = ReferenceCache()
+
+    outputs = cache.get(seed, private_keys_hex) if cache else None
+    if outputs is None:
+        outputs = compute_reference_outputs(private_keys_hex)
+        if cache:
+            try:
+                cache.put(seed, private_keys_hex, outputs)
+            except OSError:
+                pass
+
+    return {key: {'pubkey': pubkey, 'wif': wif, 'address': address}
+            for key, (pubkey, wif, address) in zip(private_keys_hex, outputs)}
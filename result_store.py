@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Compact Result Store for Bulk Derivations
+=========================================
+
+Holds the results of bulk key derivation in contiguous fixed-width byte
+columns instead of one bytes/str object per value:
+
+    keys       32 bytes per row (private key, needed to render the WIF)
+    pubkeys    33 bytes per row (compressed public key)
+    hash160s   20 bytes per row
+    checksums   4 bytes per row (P2PKH address checksum)
+
+Base58 strings are rendered only when a row is read; records() and
+wifs() render a whole view at once, with one batched checksum pass
+through base58check.b58check_encode_many. Slicing returns a
+read-only ResultsView over the same memory, without copying.
+"""
+
+from collections import namedtuple
+
+import base58check
+import hashing
+
+KEY_WIDTH = 32
+PUBKEY_WIDTH = 33
+HASH160_WIDTH = 20
+CHECKSUM_WIDTH = 4
+
+# Compressed WIF payload: version byte, private key, compression flag
+_WIF_PREFIX = bytes([base58check.WIF_VERSION])
+_WIF_SUFFIX = b'\x01'
+WIF_PAYLOAD_WIDTH = len(_WIF_PREFIX) + KEY_WIDTH + len(_WIF_SUFFIX)
+
+DerivedKey = namedtuple('DerivedKey', ['private_key', 'pubkey', 'wif', 'address'])
+
+
+class ResultsView:
+    """Read-only rows over fixed-width result columns."""
+
+    def __init__(self, keys, pubkeys, hash160s, checksums, count):
+        self._keys = keys
+        self._pubkeys = pubkeys
+        self._hash160s = hash160s
+        self._checksums = checksums
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def _index(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("result index out of range")
+        return i
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self._count)
+            if step != 1:
+                raise ValueError("Result slices must be contiguous")
+            stop = max(start, stop)
+            return ResultsView(
+                memoryview(self._keys)[start * KEY_WIDTH:stop * KEY_WIDTH],
+                memoryview(self._pubkeys)[start * PUBKEY_WIDTH:stop * PUBKEY_WIDTH],
+                memoryview(self._hash160s)[start * HASH160_WIDTH:stop * HASH160_WIDTH],
+                memoryview(self._checksums)[start * CHECKSUM_WIDTH:stop * CHECKSUM_WIDTH],
+                stop - start,
+            )
+
+        i = self._index(item)
+        return DerivedKey(self.private_key(i), self.pubkey(i), self.wif(i), self.address(i))
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def private_key(self, i):
+        """Return the 32-byte private key of row `i`."""
+        i = self._index(i)
+        return bytes(self._keys[i * KEY_WIDTH:(i + 1) * KEY_WIDTH])
+
+    def pubkey(self, i):
+        """Return the 33-byte compressed public key of row `i`."""
+        i = self._index(i)
+        return bytes(self._pubkeys[i * PUBKEY_WIDTH:(i + 1) * PUBKEY_WIDTH])
+
+    def hash160(self, i):
+        """Return the 20-byte Hash160 of row `i`."""
+        i = self._index(i)
+        return bytes(self._hash160s[i * HASH160_WIDTH:(i + 1) * HASH160_WIDTH])
+
+    def wif(self, i):
+        """Render the compressed WIF of row `i`."""
+        return base58check.encode_wif(self.private_key(i))
+
+    def address(self, i):
+        """Render the P2PKH address of row `i` from its stored checksum."""
+        i = self._index(i)
+        checksum = bytes(self._checksums[i * CHECKSUM_WIDTH:(i + 1) * CHECKSUM_WIDTH])
+        return base58check.b58encode(b'\x00' + self.hash160(i) + checksum)
+
+    def wifs(self):
+        """Render the compressed WIF of every row, checksummed in one batch."""
+        count = self._count
+        payloads = bytearray()
+        for offset in range(0, count * KEY_WIDTH, KEY_WIDTH):
+            payloads += _WIF_PREFIX
+            payloads += self._keys[offset:offset + KEY_WIDTH]
+            payloads += _WIF_SUFFIX
+        return base58check.b58check_encode_many(payloads, WIF_PAYLOAD_WIDTH)
+
+    def addresses(self):
+        """Render the P2PKH address of every row from the stored checksums."""
+        return [self.address(i) for i in range(self._count)]
+
+    def record(self, i):
+        """Render row `i` as a tab-separated pubkey/WIF/address line."""
+        return f"{self.pubkey(i).hex().upper()}\t{self.wif(i)}\t{self.address(i)}\n"
+
+    def records(self):
+        """Render every row as tab-separated pubkey/WIF/address lines."""
+        pubkeys = self._pubkeys
+        return [f"{bytes(pubkeys[i * PUBKEY_WIDTH:(i + 1) * PUBKEY_WIDTH]).hex().upper()}"
+                f"\t{wif}\t{address}\n"
+                for i, (wif, address) in enumerate(zip(self.wifs(), self.addresses()))]
+
+    def columns(self):
+        """
+        Return zero-copy memoryviews of the populated columns.
+
+        Returns:
+            Tuple of (keys, pubkeys, hash160s, checksums) memoryviews
+        """
+        count = self._count
+        return (memoryview(self._keys)[:count * KEY_WIDTH],
+                memoryview(self._pubkeys)[:count * PUBKEY_WIDTH],
+                memoryview(self._hash160s)[:count * HASH160_WIDTH],
+                memoryview(self._checksums)[:count * CHECKSUM_WIDTH])
+
+
+class ResultStore(ResultsView):
+    """Growable result columns for bulk derivation."""
+
+    def __init__(self, capacity=1024):
+        capacity = max(1, capacity)
+        super().__init__(bytearray(capacity * KEY_WIDTH),
+                         bytearray(capacity * PUBKEY_WIDTH),
+                         bytearray(capacity * HASH160_WIDTH),
+                         bytearray(capacity * CHECKSUM_WIDTH),
+                         0)
+        self._capacity = capacity
+
+    def _reserve(self, rows):
+        """
+        Grow the columns to hold `rows` rows.
+
+        New buffers are allocated rather than resized in place, so views
+        handed out earlier keep pointing at valid memory.
+        """
+        if rows <= self._capacity:
+            return
+        capacity = max(rows, 2 * self._capacity)
+        count = self._count
+        for name, width in (('_keys', KEY_WIDTH), ('_pubkeys', PUBKEY_WIDTH),
+                            ('_hash160s', HASH160_WIDTH), ('_checksums', CHECKSUM_WIDTH)):
+            column = bytearray(capacity * width)
+            column[:count * width] = getattr(self, name)[:count * width]
+            setattr(self, name, column)
+        self._capacity = capacity
+
+    def append_batch(self, private_keys, compressed_pubkeys):
+        """
+        Append a batch of derived keys.
+
+        Hash160s and address checksums are computed here for the whole
+        batch with the buffer-based functions in hashing.py.
+
+        Args:
+            private_keys: Sequence of 32-byte private keys
+            compressed_pubkeys: Their 33-byte compressed public keys
+        """
+        rows = len(private_keys)
+        if rows != len(compressed_pubkeys):
+            raise ValueError("Private key and public key counts differ")
+        if not rows:
+            return
+
+        pubkeys = b''.join(compressed_pubkeys)
+        hash160s = hashing.hash160_many(pubkeys, PUBKEY_WIDTH)
+        payloads = b''.join(b'\x00' + hash160s[offset:offset + HASH160_WIDTH]
+                            for offset in range(0, len(hash160s), HASH160_WIDTH))
+        checksums = hashing.checksum_many(payloads, 1 + HASH160_WIDTH)
+
+        start = self._count
+        end = start + rows
+        self._reserve(end)
+        self._keys[start * KEY_WIDTH:end * KEY_WIDTH] = b''.join(private_keys)
+        self._pubkeys[start * PUBKEY_WIDTH:end * PUBKEY_WIDTH] = pubkeys
+        self._hash160s[start * HASH160_WIDTH:end * HASH160_WIDTH] = hash160s
+        self._checksums[start * CHECKSUM_WIDTH:end * CHECKSUM_WIDTH] = checksums
+        self._count = end
@@ -8,46 +8,149 @@ Students cannot predict the answers since private keys are generated randomly.
 
 For GitHub Actions: Set ASSIGNMENT_SEED environment variable for reproducible tests.
 For local testing: Uses random private keys for validation (answers unknown to students).
+
+Seeded keys use the same scheme as secure_test_runner.py: key i is
+SHA256("<seed>_test_<i>") reduced into the secp256k1 range [1, n-1].
+
+Bulk corpora can be streamed lazily, sharded across workers and written
+as text (one hex key per line) or binary (raw 32-byte keys, as read by
+`derive_cli.py --key-file`):
+
+    python3 secure_tests.py --count 10000000 --format binary --output keys.bin
+    python3 secure_tests.py --count 10000000 --shard 3 --shards 8 > part3.txt
 """
 
 import os
+import sys
+import argparse
 import hashlib
 import secrets
-import sys
+
+SECP256K1_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+# Keys derived per chunk; chunks are the unit of sharding
+DEFAULT_CHUNK_SIZE = 4096
+
+
+def derive_test_key(seed, index):
+    """
+    Derive test key `index` for `seed` (the scheme used by the test runner).
+
+    Returns:
+        32-byte private key in [1, n-1]
+    """
+    key_hash = hashlib.sha256(f"{seed}_test_{index}".encode()).digest()
+    key_int = (int.from_bytes(key_hash, 'big') % (SECP256K1_ORDER - 1)) + 1
+    return key_int.to_bytes(32, 'big')
+
+
+def iter_test_key_chunks(seed, start=0, count=None, shard=0, shards=1,
+                         chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Lazily derive test keys in chunks.
+
+    Keys are numbered from 0; key i depends only on the seed and i, so the
+    corpus is identical however it is sharded. Chunk c holds keys
+    c * chunk_size ... (c + 1) * chunk_size - 1 and belongs to shard
+    c % shards, which gives every shard a disjoint, reproducible slice.
+
+    Args:
+        seed: Seed string, or None for random keys
+        start: Index of the first key of the corpus
+        count: Number of keys in the whole corpus, or None for unlimited
+        shard: This worker's shard number, 0 <= shard < shards
+        shards: Total number of shards
+        chunk_size: Keys per chunk
+
+    Yields:
+        Tuples of (index of the first key, list of 32-byte private keys)
+    """
+    if not 0 <= shard < shards:
+        raise ValueError("Shard must be in the range [0, shards)")
+
+    order = SECP256K1_ORDER - 1
+    prefix = hashlib.sha256(f"{seed}_test_".encode()) if seed is not None else None
+    end = None if count is None else start + count
+
+    chunk = shard
+    while True:
+        first = start + chunk * chunk_size
+        if end is not None and first >= end:
+            return
+        last = first + chunk_size if end is None else min(first + chunk_size, end)
+
+        keys = []
+        for index in range(first, last):
+            if prefix is None:
+                key_int = (int.from_bytes(secrets.token_bytes(32), 'big') % order) + 1
+            else:
+                h = prefix.copy()
+                h.update(str(index).encode())
+                key_int = (int.from_bytes(h.digest(), 'big') % order) + 1
+            keys.append(key_int.to_bytes(32, 'big'))
+        yield first, keys
+        chunk += shards
+
+
+def iter_test_keys(seed, start=0, count=None, shard=0, shards=1,
+                   chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Lazily derive test keys one at a time (see iter_test_key_chunks).
+
+    Yields:
+        Tuples of (key index, 32-byte private key)
+    """
+    for first, keys in iter_test_key_chunks(seed, start, count, shard, shards, chunk_size):
+        for offset, key in enumerate(keys):
+            yield first + offset, key
+
+
+def write_key_file(outfile, chunks, fmt='text'):
+    """
+    Write key chunks to a binary stream.
+
+    Args:
+        outfile: Binary stream
+        chunks: Iterable of (first index, list of 32-byte keys)
+        fmt: 'text' for one uppercase hex key per line, 'binary' for raw
+            32-byte keys back to back
+
+    Returns:
+        Number of keys written
+    """
+    written = 0
+    for _, keys in chunks:
+        if fmt == 'binary':
+            outfile.write(b''.join(keys))
+        else:
+            outfile.write(b''.join(key.hex().upper().encode() + b'\n' for key in keys))
+        written += len(keys)
+    return written
 
 
 class SecureTestGenerator:
     def __init__(self):
         # Use environment variable for reproducible tests in CI/CD
-        seed = os.environ.get('ASSIGNMENT_SEED')
-        if seed:
-            # Deterministic generation for CI/CD
-            self.rng = hashlib.sha256(seed.encode()).digest()
-        else:
-            # Random generation for local testing
-            self.rng = None
+        # Deterministic generation for CI/CD, random generation for local testing
+        self.seed = os.environ.get('ASSIGNMENT_SEED')
     
     def generate_private_key(self, test_index=0):
         """Generate a valid secp256k1 private key."""
-        if self.rng:
-            # Deterministic: use seed + test index
-            data = self.rng + test_index.to_bytes(4, 'big')
-            private_key = hashlib.sha256(data).digest()
+        if self.seed:
+            # Deterministic: same scheme as the test runner
+            private_key = derive_test_key(self.seed, test_index)
         else:
-            # Random: generate unpredictable private key
-            private_key = secrets.token_bytes(32)
-        
-        # Ensure private key is in valid secp256k1 range [1, n-1]
-        # secp256k1 order: FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
-        key_int = int.from_bytes(private_key, 'big')
-        secp256k1_order = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
-        
-        if key_int == 0 or key_int >= secp256k1_order:
-            # If invalid, increment until valid (very rare)
-            key_int = (key_int % (secp256k1_order - 1)) + 1
+            # Random: generate unpredictable private key in [1, n-1]
+            key_int = (int.from_bytes(secrets.token_bytes(32), 'big') % (SECP256K1_ORDER - 1)) + 1
             private_key = key_int.to_bytes(32, 'big')
         
         return private_key.hex().upper()
+
+    def iter_private_keys(self, start=0, count=None, shard=0, shards=1,
+                          chunk_size=DEFAULT_CHUNK_SIZE):
+        """Lazily yield (index, hex private key) pairs; see iter_test_key_chunks."""
+        for index, key in iter_test_keys(self.seed or None, start, count, shard, shards, chunk_size):
+            yield index, key.hex().upper()
     
     def generate_test_cases(self, count=3):
         """Generate test cases with random private keys."""
@@ -62,8 +165,45 @@ class SecureTestGenerator:
         return tests
 
 
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Generate secp256k1 test keys")
+    parser.add_argument('--count', type=int, default=None,
+                        help="write a corpus of COUNT keys instead of printing test cases")
+    parser.add_argument('--start', type=int, default=0,
+                        help="index of the first key of the corpus")
+    parser.add_argument('--shard', type=int, default=0,
+                        help="this worker's shard number (0-based)")
+    parser.add_argument('--shards', type=int, default=1,
+                        help="total number of shards")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="keys per chunk (the unit of sharding)")
+    parser.add_argument('--format', choices=('text', 'binary'), default='text',
+                        help="hex lines or raw 32-byte keys")
+    parser.add_argument('--output', metavar='PATH',
+                        help="write the corpus to PATH instead of stdout")
+    return parser.parse_args(argv)
+
+
 def main():
-    """Generate secure test cases."""
+    """Generate secure test cases, or a key corpus with --count."""
+    args = parse_args()
+
+    if args.count is not None:
+        seed = os.environ.get('ASSIGNMENT_SEED') or None
+        try:
+            chunks = iter_test_key_chunks(seed, args.start, args.count, args.shard,
+                                          args.shards, max(1, args.chunk_size))
+            if args.output:
+                with open(args.output, 'wb') as outfile:
+                    write_key_file(outfile, chunks, args.format)
+            else:
+                write_key_file(sys.stdout.buffer, chunks, args.format)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
     generator = SecureTestGenerator()
     tests = generator.generate_test_cases(3)
     
@@ -76,4 +216,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
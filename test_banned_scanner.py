@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Banned Scanner Tests
+====================
+
+Checks for banned_scanner.py that do not need a solution or a seed.
+
+Usage:
+    python3 -m unittest test_banned_scanner
+"""
+
+import unittest
+
+from banned_scanner import scan_text
+
+
+class ImportRulesTest(unittest.TestCase):
+    """The 'imports' rule set run by check_banned_simple.sh."""
+
+    def test_plain_imports(self):
+        self.assertTrue(scan_text('import bitcoin\n', 'python', 'imports'))
+        self.assertTrue(scan_text('from bip_utils import Bip32\n', 'python', 'imports'))
+
+    def test_string_imports(self):
+        self.assertTrue(scan_text('exec("import bitcoin")\n', 'python', 'imports'))
+        self.assertTrue(scan_text('__import__("bitcoinlib")\n', 'python', 'imports'))
+        self.assertTrue(scan_text('importlib.import_module("hdwallet")\n', 'python', 'imports'))
+
+    def test_allowed_imports(self):
+        source = 'import hashlib\nimport ecdsa\nimport base58\n__import__("ecdsa")\n'
+        self.assertEqual(scan_text(source, 'python', 'imports'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Watch-List Matching for Derived Keys
+====================================
+
+Matches derived keys against a large set of target P2PKH addresses at the
+Hash160 step, so non-matching keys never pay for the address checksum or
+Base58 encoding.
+
+Target addresses are decoded once into an index file:
+
+    header      8-byte magic, entry count, Bloom filter size in bits (a
+                power of two), number of Bloom probes
+    bloom       Bloom filter over the Hash160s
+    hash160s    sorted, de-duplicated 20-byte Hash160s
+
+The file is memory-mapped, so an index of millions of addresses opens
+instantly and is shared between worker processes through the page cache.
+A text file of addresses can be used directly; index_path() indexes it
+once for a bulk run, so worker processes map that index instead of each
+decoding the addresses (and reporting bad lines) again.
+Hash160s are uniformly distributed, so the Bloom probe positions are
+taken from the Hash160 bytes directly instead of rehashing. A lookup that
+passes the Bloom filter is confirmed by binary search over the sorted
+array, so the filter never causes false matches.
+
+Usage:
+    python3 watchlist.py build addresses.txt targets.watch
+    python3 watchlist.py check targets.watch 1BgGZ9tcN4rm9KBzDn7KprQz87SZ26SAMH
+    python3 derive_cli.py --range <START> 1000000 --watch targets.watch
+"""
+
+import os
+import sys
+import mmap
+import struct
+import tempfile
+import contextlib
+
+import base58check
+from result_store import HASH160_WIDTH
+
+MAGIC = b'WATCHLS1'
+HEADER = struct.Struct('>8sQQI')
+
+# Bloom filter sizing: ~0.05% false positive rate before the exact check
+DEFAULT_BITS_PER_ENTRY = 16
+DEFAULT_PROBES = 11
+
+
+def _bloom_positions(hash160, mask, probes):
+    """Yield the Bloom bit positions of a Hash160 (double hashing on its own bytes)."""
+    h1 = int.from_bytes(hash160[:8], 'little')
+    h2 = int.from_bytes(hash160[8:16], 'little') | 1
+    for i in range(probes):
+        yield (h1 + i * h2) & mask
+
+
+def build_index(hash160s, bits_per_entry=DEFAULT_BITS_PER_ENTRY, probes=DEFAULT_PROBES):
+    """
+    Build an index from Hash160s.
+
+    Args:
+        hash160s: Iterable of 20-byte Hash160s (duplicates are dropped)
+        bits_per_entry: Bloom filter bits per entry, before rounding the
+            filter size up to a power of two
+        probes: Bloom probes per entry
+
+    Returns:
+        Index file contents as bytes
+    """
+    entries = sorted(set(bytes(h) for h in hash160s))
+    for entry in entries:
+        if len(entry) != HASH160_WIDTH:
+            raise ValueError("Hash160 entries must be 20 bytes")
+
+    bits = 64
+    while bits < len(entries) * bits_per_entry:
+        bits <<= 1
+    mask = bits - 1
+    bloom = bytearray(bits // 8)
+    for entry in entries:
+        for position in _bloom_positions(entry, mask, probes):
+            bloom[position >> 3] |= 1 << (position & 7)
+
+    return HEADER.pack(MAGIC, len(entries), bits, probes) + bytes(bloom) + b''.join(entries)
+
+
+def decode_addresses(lines, errfile=None):
+    """
+    Decode P2PKH addresses, one per line, into Hash160s.
+
+    Blank lines are skipped. Invalid addresses are reported on `errfile`
+    with their line number and skipped.
+
+    Yields:
+        20-byte Hash160s
+    """
+    for line_number, line in enumerate(lines, 1):
+        address = line.strip()
+        if not address:
+            continue
+        try:
+            yield base58check.decode_address(address)
+        except ValueError as e:
+            if errfile is not None:
+                print(f"Error: line {line_number}: {e}", file=errfile)
+
+
+def write_index(path, hash160s, **kwargs):
+    """
+    Build an index and write it to `path` atomically.
+
+    Returns:
+        Number of distinct entries written
+    """
+    data = build_index(hash160s, **kwargs)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return HEADER.unpack_from(data)[1]
+
+
+class WatchList:
+    """Read-only Hash160 set over index bytes or a memory-mapped index file."""
+
+    def __init__(self, data, mapping=None):
+        view = memoryview(data)
+        if len(view) < HEADER.size:
+            raise ValueError("Watch-list index is truncated")
+        magic, count, bits, probes = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Not a watch-list index")
+        bloom_end = HEADER.size + bits // 8
+        if bits & (bits - 1) or len(view) != bloom_end + count * HASH160_WIDTH:
+            raise ValueError("Watch-list index is corrupt")
+
+        self._mapping = mapping
+        self._view = view
+        self._bloom = view[HEADER.size:bloom_end]
+        self._entries = view[bloom_end:]
+        self._count = count
+        self._mask = bits - 1
+        self._probes = probes
+
+    @classmethod
+    def open(cls, path):
+        """
+        Open a watch list.
+
+        `path` is either an index file (memory-mapped) or a text file of
+        addresses, one per line, which is indexed in memory.
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                f.seek(0)
+                lines = (line.decode('ascii', 'replace') for line in f)
+                return cls(build_index(decode_addresses(lines, sys.stderr)))
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapping, mapping)
+
+    @classmethod
+    def from_addresses(cls, addresses):
+        """Index an iterable of P2PKH addresses in memory."""
+        return cls(build_index(base58check.decode_address(a) for a in addresses))
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def mapped(self):
+        """True if the list is a memory-mapped index file."""
+        return self._mapping is not None
+
+    def close(self):
+        """Release the mapping (if any)."""
+        for view in (self._bloom, self._entries, self._view):
+            view.release()
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+    def __contains__(self, hash160):
+        bloom = self._bloom
+        for position in _bloom_positions(hash160, self._mask, self._probes):
+            if not bloom[position >> 3] >> (position & 7) & 1:
+                return False
+
+        entries = self._entries
+        target = bytes(hash160)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = entries[mid * HASH160_WIDTH:(mid + 1) * HASH160_WIDTH].tobytes()
+            if entry < target:
+                lo = mid + 1
+            elif entry > target:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def match(self, hash160s):
+        """
+        Find the rows of a Hash160 column that are on the watch list.
+
+        Args:
+            hash160s: Bytes-like object of 20-byte Hash160s back to back
+
+        Returns:
+            List of matching row numbers, in order
+        """
+        view = memoryview(hash160s)
+        return [row for row, offset in enumerate(range(0, len(view), HASH160_WIDTH))
+                if view[offset:offset + HASH160_WIDTH] in self]
+
+
+_open_lists = {}
+
+
+def load(path):
+    """Open the watch list at `path` once per process and reuse it."""
+    watch = _open_lists.get(path)
+    if watch is None:
+        watch = _open_lists[path] = WatchList.open(path)
+    return watch
+
+
+@contextlib.contextmanager
+def index_path(path):
+    """
+    Provide an index file for the watch list at `path`.
+
+    An index file is used as it is. A text file of addresses is decoded
+    once, here, into a temporary index file that is deleted on exit.
+
+    Yields:
+        Path of an index file holding the same addresses
+    """
+    watch = load(path)
+    if watch.mapped:
+        yield path
+        return
+    fd, tmp_path = tempfile.mkstemp(suffix='.watch')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(watch._view)
+        yield tmp_path
+    finally:
+        os.unlink(tmp_path)
+
+
+def main():
+    """Command line entry point: build or query an index."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="P2PKH watch-list index")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="index a file of addresses, one per line")
+    build.add_argument('addresses', help="text file of P2PKH addresses ('-' for stdin)")
+    build.add_argument('index', help="index file to write")
+    build.add_argument('--bits-per-entry', type=int, default=DEFAULT_BITS_PER_ENTRY)
+    build.add_argument('--probes', type=int, default=DEFAULT_PROBES)
+    check = commands.add_parser('check', help="look addresses up in an index")
+    check.add_argument('index', help="index file (or text file of addresses)")
+    check.add_argument('address', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if args.addresses == '-':
+            lines = sys.stdin
+        else:
+            lines = open(args.addresses, 'r', encoding='ascii', errors='replace')
+        with lines:
+            count = write_index(args.index, decode_addresses(lines, sys.stderr),
+                                bits_per_entry=max(1, args.bits_per_entry),
+                                probes=max(1, args.probes))
+        print(f"✓ Indexed {count} addresses into {args.index}")
+        return
+
+    watch = WatchList.open(args.index)
+    found = True
+    for address in args.address:
+        try:
+            hit = base58check.decode_address(address) in watch
+        except ValueError as e:
+            print(f"Error: {address}: {e}", file=sys.stderr)
+            hit = False
+        print(f"{address}\t{'match' if hit else 'no match'}")
+        found = found and hit
+    sys.exit(0 if found else 1)
+
+
+if __name__ == '__main__':
+    main()